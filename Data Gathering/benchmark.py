@@ -0,0 +1,194 @@
+# benchmark.py
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import config
+from synthetic_data import generate_network
+
+# Preset network sizes: (airports, routes).
+SIZES = {
+    'small': (1_000, 100_000),
+    'medium': (10_000, 1_000_000),
+    'large': (17_576, 10_000_000),
+    'xlarge': (100_000, 50_000_000),
+}
+
+VARIANTS = ['parse', 'weights_scalar', 'weights_vectorized', 'graph', 'csr', 'vectorized', 'parallel', 'snapshot_warm']
+
+def _rss_bytes():
+    """Current resident set size, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _peak_rss_bytes():
+    """Peak resident set size of this process."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _collect_routes():
+    """Runs only the streaming parse stage and returns the accepted routes."""
+    from graph import Graph
+    from data_loader import _load_airports, _stream_route_rows, _resolve_direct_routes
+
+    flight_graph = Graph()
+    _load_airports(flight_graph)
+    stats = {'rows': 0, 'malformed': 0, 'indirect': 0, 'unknown_airport': 0}
+    rows = _stream_route_rows(config.ROUTES_FILE, stats)
+    return flight_graph, list(_resolve_direct_routes(rows, flight_graph, stats)), stats
+
+def _time_weights_scalar(flight_graph, routes):
+    from collections import Counter
+    from data_loader import _calculate_haversine_distance, _calculate_cost, _simulate_delay
+
+    start = time.perf_counter()
+    frequencies = Counter((source.iata, dest.iata) for _, source, dest in routes)
+    for airline_code, source, dest in routes:
+        distance = _calculate_haversine_distance(source.lat, source.lon, dest.lat, dest.lon)
+        round(_calculate_cost(distance, airline_code, frequencies[(source.iata, dest.iata)]), 2)
+        _simulate_delay(airline_code)
+    return time.perf_counter() - start
+
+def _time_weights_vectorized(flight_graph, routes):
+    from edge_weights import compute_edge_weights
+
+    ids = {iata: i for i, iata in enumerate(flight_graph.airports)}
+    lat = [airport.lat for airport in flight_graph.airports.values()]
+    lon = [airport.lon for airport in flight_graph.airports.values()]
+    sources = [ids[source.iata] for _, source, _ in routes]
+    targets = [ids[dest.iata] for _, _, dest in routes]
+    airlines = [airline_code for airline_code, _, _ in routes]
+    start = time.perf_counter()
+    compute_edge_weights(lat, lon, sources, targets, airlines)
+    return time.perf_counter() - start
+
+def _count_edges(network):
+    if hasattr(network, 'num_edges'):
+        return network.num_edges
+    return sum(len(edges) for edges in network.adjacency_list.values())
+
+def run_variant(variant):
+    """Runs one loader variant in this process and returns its measurements."""
+    import data_loader
+    import parallel_loader
+    import snapshot
+
+    result = {'variant': variant}
+    gc.collect()
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+
+    if variant in ('parse', 'weights_scalar', 'weights_vectorized'):
+        flight_graph, routes, stats = _collect_routes()
+        result['parse_s'] = time.perf_counter() - start
+        result['rows'] = stats['rows']
+        result['rows_per_s'] = stats['rows'] / result['parse_s']
+        result['edges'] = len(routes)
+        if variant == 'weights_scalar':
+            result['weights_s'] = _time_weights_scalar(flight_graph, routes)
+        elif variant == 'weights_vectorized':
+            result['weights_s'] = _time_weights_vectorized(flight_graph, routes)
+        network = None
+    else:
+        if variant == 'graph':
+            network = data_loader.build_flight_network()
+        elif variant == 'csr':
+            network = data_loader.build_flight_network(as_csr=True)
+        elif variant == 'vectorized':
+            network = data_loader.build_flight_network(as_csr=True, vectorized=True)
+        elif variant == 'parallel':
+            network = parallel_loader.build_flight_network_parallel()
+        elif variant == 'snapshot_warm':
+            snapshot_path = os.path.join(os.path.dirname(os.path.abspath(config.ROUTES_FILE)), config.SNAPSHOT_FILE)
+            snapshot.load_flight_network(snapshot_path, as_csr=True) # Prime the cache; only the warm load is timed
+            gc.collect()
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            network = snapshot.load_flight_network(snapshot_path, as_csr=True)
+        else:
+            raise ValueError(f"Unknown variant: {variant}")
+        result['total_s'] = time.perf_counter() - start
+        result['edges'] = _count_edges(network)
+
+    gc.collect()
+    rss_after = _rss_bytes()
+    if network is not None and rss_before is not None and result['edges']:
+        result['bytes_per_edge'] = (rss_after - rss_before) / result['edges']
+    result['peak_rss_mb'] = (_peak_rss_bytes() or 0) / (1024 * 1024)
+    return result
+
+def run_suite(sizes, variants, work_dir, results_file, seed=0):
+    """
+    Generates each network size once, runs every variant in a fresh
+    subprocess (so peak RSS is per variant), and appends one JSON line per
+    measurement to results_file.
+    """
+    commit = _git_commit()
+    for size in sizes:
+        num_airports, num_routes = SIZES[size]
+        data_dir = os.path.join(work_dir, size)
+        airports_file, routes_file = os.path.join(data_dir, 'airports.dat'), os.path.join(data_dir, 'routes.dat')
+        if not (os.path.exists(airports_file) and os.path.exists(routes_file)):
+            print(f"✈️  Generating '{size}' network ({num_airports:,} airports, {num_routes:,} routes)...")
+            generate_network(data_dir, num_airports, num_routes, seed)
+
+        for variant in variants:
+            print(f"⏱️  {size} / {variant} ...")
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--run-variant', variant,
+                 '--airports-file', airports_file, '--routes-file', routes_file],
+                capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+            )
+            if completed.returncode != 0:
+                print(f"Error: {variant} failed on {size}:\n{completed.stderr}")
+                continue
+            measurement = json.loads(completed.stdout.strip().splitlines()[-1])
+            measurement.update({
+                'size': size, 'airports': num_airports, 'routes': num_routes, 'commit': commit,
+                'python': platform.python_version(), 'cpus': os.cpu_count(),
+                'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            })
+            with open(results_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(measurement) + '\n')
+            print(f"   {json.dumps(measurement)}")
+
+def _git_commit():
+    try:
+        # Run from this file's directory so the commit is this repo's, wherever the benchmark is launched from.
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the flight network loaders on synthetic data.")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['small'])
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=VARIANTS)
+    parser.add_argument('--work-dir', default='synthetic')
+    parser.add_argument('--results-file', default='benchmark_results.jsonl')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--run-variant', help=argparse.SUPPRESS)
+    parser.add_argument('--airports-file', help=argparse.SUPPRESS)
+    parser.add_argument('--routes-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_variant:
+        # Child process: the measurement is the last line of stdout, after the loaders' progress output.
+        config.AIRPORTS_FILE, config.ROUTES_FILE = args.airports_file, args.routes_file
+        measurement = run_variant(args.run_variant)
+        print(json.dumps(measurement))
+    else:
+        run_suite(args.sizes, args.variants, args.work_dir, args.results_file, args.seed)
@@ -17,3 +17,19 @@ FREQUENT_ROUTE_THRESHOLD = 10
 # --- Delay Model Parameters ---
 HIGH_DELAY_RANGE = (30, 120)
 LOW_DELAY_RANGE = (5, 45)
+AIRLINE_DELAY_RANGES = {} # Optional per-airline (min, max) overrides for delay scenarios
+
+# --- Delay Scenarios ---
+SCENARIO_SEED = 42
+SCENARIO_BLOCK_SIZE = 256 # Scenarios generated per streamed block
+
+# --- Snapshot Cache ---
+SNAPSHOT_FILE = 'flight_network.snap'
+
+# --- Ingest Reporting ---
+INGEST_PROGRESS_INTERVAL = 500000 # Rows between rows/sec progress reports
+
+# --- Parallel Ingest ---
+PARSE_WORKERS = None # Process pool size; None uses every core
+PARSE_CHUNK_BYTES = 32 * 1024 * 1024 # Target byte range handed to each worker
+PARSE_DELAY_SEED = 0 # Base seed of the per-chunk delay RNGs in parallel_loader
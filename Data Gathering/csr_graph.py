@@ -0,0 +1,137 @@
+# csr_graph.py
+
+from array import array
+from graph import Graph, METRICS
+from spatial_index import SpatialIndex
+
+class CSRGraph:
+    """
+    Compressed-sparse-row form of the flight network.
+
+    Airports are interned to integer ids 0..V-1. The outgoing edges of
+    airport i are edges offsets[i] .. offsets[i+1]-1; targets[e] is the
+    destination id of edge e and weights[metric][e] its weight.
+
+    Space Complexity: O(V + E), with no per-edge Python objects.
+    """
+    def __init__(self, airports, offsets, targets, weights, lat=None, lon=None, airline_ids=None, airline_codes=None):
+        self.airports = airports # List of Airport objects, indexed by id
+        self.ids = {airport.iata: i for i, airport in enumerate(airports)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights # Maps metric name to a flat per-edge array
+        self.lat = lat if lat is not None else array('d', (a.lat for a in airports))
+        self.lon = lon if lon is not None else array('d', (a.lon for a in airports))
+        # Optional per-edge airline, needed to reweight: airline_codes[airline_ids[e]] is
+        # the code of edge e. Interned so each edge costs 4 bytes, not a Python string.
+        self.airline_ids = airline_ids
+        self.airline_codes = airline_codes
+        self._spatial_index = None
+
+    @staticmethod
+    def intern_airlines(airlines):
+        """Interns per-edge airline codes into (array('i') of ids, list of distinct codes)."""
+        code_ids = {}
+        airline_ids = array('i', (code_ids.setdefault(code, len(code_ids)) for code in airlines))
+        return airline_ids, list(code_ids)
+
+    @classmethod
+    def from_edges(cls, airports, sources, targets, weights, airlines=None):
+        """
+        Builds a CSRGraph from parallel edge columns in any order.
+
+        Edges are grouped by source with a stable counting sort, so each
+        airport keeps its edges in input order. Time Complexity: O(V + E).
+        """
+        num_nodes = len(airports)
+        offsets = array('q', bytes(8 * (num_nodes + 1)))
+        for s in sources:
+            offsets[s + 1] += 1
+        for i in range(num_nodes):
+            offsets[i + 1] += offsets[i]
+
+        cursor = offsets[:-1]
+        order = array('q', bytes(8 * len(sources)))
+        for e, s in enumerate(sources):
+            order[cursor[s]] = e
+            cursor[s] += 1
+
+        sorted_targets = array('i', (targets[e] for e in order))
+        sorted_weights = {metric: array('d', (column[e] for e in order)) for metric, column in weights.items()}
+        if airlines is None:
+            return cls(airports, offsets, sorted_targets, sorted_weights)
+        airline_ids, airline_codes = cls.intern_airlines(airlines[e] for e in order)
+        return cls(airports, offsets, sorted_targets, sorted_weights, airline_ids=airline_ids, airline_codes=airline_codes)
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Converts an adjacency-list Graph into CSR form."""
+        airports = list(graph.airports.values())
+        ids = {airport.iata: i for i, airport in enumerate(airports)}
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = {metric: array('d') for metric in METRICS}
+        airlines = []
+        for airport in airports:
+            for dest_iata, w in graph.adjacency_list[airport.iata]:
+                targets.append(ids[dest_iata])
+                airlines.append(w.get('airline'))
+                for metric in METRICS:
+                    weights[metric].append(w[metric])
+            offsets.append(len(targets))
+        if None in airlines:
+            return cls(airports, offsets, targets, weights)
+        airline_ids, airline_codes = cls.intern_airlines(airlines)
+        return cls(airports, offsets, targets, weights, airline_ids=airline_ids, airline_codes=airline_codes)
+
+    def to_graph(self):
+        """Expands the CSR arrays back into an adjacency-list Graph."""
+        graph = Graph()
+        for airport in self.airports:
+            graph.add_node(airport)
+        distance, cost, delay = (self.weights[m] for m in METRICS)
+        for i, airport in enumerate(self.airports):
+            edges = graph.adjacency_list[airport.iata]
+            for e in range(self.offsets[i], self.offsets[i + 1]):
+                weights = {"distance": float(distance[e]), "cost": float(cost[e]), "delay": int(delay[e])}
+                if self.airline_ids is not None:
+                    weights["airline"] = self.airline_codes[self.airline_ids[e]]
+                edges.append((self.airports[self.targets[e]].iata, weights))
+        return graph
+
+    @property
+    def num_nodes(self):
+        return len(self.airports)
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def get_id(self, iata):
+        """Returns the integer id of an airport, or None if it is unknown."""
+        return self.ids.get(iata)
+
+    def get_airport(self, iata):
+        """Retrieves an Airport object by its IATA code."""
+        node_id = self.ids.get(iata)
+        return self.airports[node_id] if node_id is not None else None
+
+    def spatial_index(self):
+        """Returns the SpatialIndex over all airports, building it once on first use."""
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(self.airports)
+        return self._spatial_index
+
+    def edge_range(self, node_id):
+        """Returns the range of edge indices leaving an airport id."""
+        return range(self.offsets[node_id], self.offsets[node_id + 1])
+
+    def neighbors(self, node_id, metric):
+        """Yields (target_id, weight) for each edge leaving an airport id."""
+        column = self.weights[metric]
+        for e in range(self.offsets[node_id], self.offsets[node_id + 1]):
+            yield self.targets[e], column[e]
+
+    def __str__(self):
+        """Returns a string summary of the graph."""
+        return f"CSR Flight Network with {self.num_nodes} airports and {self.num_edges} routes."
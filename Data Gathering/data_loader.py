@@ -2,9 +2,12 @@
 
 import csv
 import random
+import time
 from math import radians, sin, cos, sqrt, atan2
+from array import array
 from collections import Counter
 from graph import Graph, Airport
+from csr_graph import CSRGraph, METRICS
 import config
 
 def _calculate_haversine_distance(lat1, lon1, lat2, lon2):
@@ -17,73 +20,167 @@ def _calculate_haversine_distance(lat1, lon1, lat2, lon2):
     c = 2 * atan2(sqrt(a), sqrt(1 - a))
     return R * c
 
-def _calculate_route_frequencies():
-    """Pre-processes the routes file to count route frequencies."""
-    print("... Calculating route frequencies ...")
-    route_counts = Counter()
+def _calculate_cost(distance, airline_code, frequency):
+    """Applies the config cost model to a single route."""
+    base_cost = config.BASE_COST + (distance * config.COST_PER_KM)
+    airline_multiplier = config.BUDGET_AIRLINE_MULTIPLIER if airline_code in config.BUDGET_AIRLINES else config.STANDARD_AIRLINE_MULTIPLIER
+    frequency_multiplier = config.FREQUENCY_DISCOUNT_MULTIPLIER if frequency > config.FREQUENT_ROUTE_THRESHOLD else 1.0
+    return base_cost * airline_multiplier * frequency_multiplier
+
+def _simulate_delay(airline_code, rng=random):
+    """Draws a simulated delay in minutes for one route from rng (the global random module by default)."""
+    delay_range = config.HIGH_DELAY_RANGE if airline_code in config.DELAY_PRONE_AIRLINES else config.LOW_DELAY_RANGE
+    return rng.randint(*delay_range)
+
+def _report_progress(stats, start_time):
+    """Prints rows/sec and rejected-row counts for the route ingest."""
+    elapsed = max(time.perf_counter() - start_time, 1e-9)
+    rejected = stats['malformed'] + stats['indirect'] + stats['unknown_airport']
+    print(f"... {stats['rows']:,} rows parsed ({stats['rows'] / elapsed:,.0f} rows/sec, {rejected:,} rejected) ...")
+
+def _stream_route_rows(routes_file, stats):
+    """Yields each parsed row of the routes file exactly once."""
+    start_time = time.perf_counter()
+    with open(routes_file, 'r', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            stats['rows'] += 1
+            if stats['rows'] % config.INGEST_PROGRESS_INTERVAL == 0:
+                _report_progress(stats, start_time)
+            yield row
+    _report_progress(stats, start_time)
+
+def _resolve_direct_routes(rows, flight_graph, stats):
+    """Drops malformed and non-direct rows, yielding (airline, source, dest) Airport pairs."""
+    for row in rows:
+        try:
+            airline_code, source_iata, dest_iata, stops = row[1], row[2], row[4], row[7]
+        except IndexError:
+            stats['malformed'] += 1
+            continue
+        if stops != '0':
+            stats['indirect'] += 1
+            continue
+        source_airport = flight_graph.get_airport(source_iata)
+        dest_airport = flight_graph.get_airport(dest_iata)
+        if not (source_airport and dest_airport):
+            stats['unknown_airport'] += 1
+            continue
+        yield airline_code, source_airport, dest_airport
+
+def _parse_airport_row(row):
+    """Returns an Airport for a row with a valid IATA code, else None."""
     try:
-        with open(config.ROUTES_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                try:
-                    if row[7] == '0':
-                        route_counts[(row[2], row[4])] += 1
-                except IndexError:
-                    continue
-    except FileNotFoundError:
-        print(f"Error: {config.ROUTES_FILE} not found.")
-    print("✅ Frequencies calculated.")
-    return route_counts
+        iata, name, city, country = row[4], row[1], row[2], row[3]
+        lat, lon = float(row[6]), float(row[7])
+    except (ValueError, IndexError):
+        return None
+    if iata != '\\N' and len(iata) == 3:
+        return Airport(iata, name, city, country, lat, lon)
+    return None
+
+def _load_airports(flight_graph):
+    """Adds every airport with a valid IATA code to the graph."""
+    with open(config.AIRPORTS_FILE, 'r', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            airport = _parse_airport_row(row)
+            if airport:
+                flight_graph.add_node(airport)
 
-def build_flight_network():
-    """Builds the flight network graph from source files using config settings."""
+def build_flight_network(as_csr=False, vectorized=False):
+    """
+    Builds the flight network graph from source files using config settings.
+
+    routes.dat is parsed in a single streaming pass: distance and delay are
+    computed as rows arrive, and costs are finalized once the route
+    frequencies are known. With as_csr=True the edges are written straight
+    into a CSRGraph instead of an adjacency-list Graph. With vectorized=True
+    the accepted routes are only collected as id/airline columns and all
+    weights are computed afterwards in one NumPy pass (see edge_weights.py).
+    """
     flight_graph = Graph()
-    route_frequencies = _calculate_route_frequencies()
 
     # Step 1: Load Airports
     print("✈️  Loading airports...")
     try:
-        with open(config.AIRPORTS_FILE, 'r', encoding='utf-8') as f:
-            for row in csv.reader(f):
-                try:
-                    iata, name, city, country = row[4], row[1], row[2], row[3]
-                    lat, lon = float(row[6]), float(row[7])
-                    if iata != '\\N' and len(iata) == 3:
-                        flight_graph.add_node(Airport(iata, name, city, country, lat, lon))
-                except (ValueError, IndexError):
-                    continue
+        _load_airports(flight_graph)
     except FileNotFoundError:
         print(f"Error: {config.AIRPORTS_FILE} not found."); return None
     print(f"✅ Loaded {len(flight_graph.airports)} airports.")
 
-    # Step 2: Load Routes
+    # Step 2: Stream Routes, counting frequencies as we go
     print("✈️  Loading routes...")
-    routes_loaded = 0
+    stats = {'rows': 0, 'malformed': 0, 'indirect': 0, 'unknown_airport': 0}
+    route_frequencies = Counter()
+    pending_routes = []
     try:
-        with open(config.ROUTES_FILE, 'r', encoding='utf-8') as f:
-            for row in csv.reader(f):
-                try:
-                    airline_code, source_iata, dest_iata, stops = row[1], row[2], row[4], row[7]
-                    if stops == '0':
-                        source_airport = flight_graph.get_airport(source_iata)
-                        dest_airport = flight_graph.get_airport(dest_iata)
-                        if source_airport and dest_airport:
-                            distance = _calculate_haversine_distance(source_airport.lat, source_airport.lon, dest_airport.lat, dest_airport.lon)
-                            
-                            base_cost = config.BASE_COST + (distance * config.COST_PER_KM)
-                            airline_multiplier = config.BUDGET_AIRLINE_MULTIPLIER if airline_code in config.BUDGET_AIRLINES else config.STANDARD_AIRLINE_MULTIPLIER
-                            frequency_multiplier = config.FREQUENCY_DISCOUNT_MULTIPLIER if route_frequencies.get((source_iata, dest_iata), 0) > config.FREQUENT_ROUTE_THRESHOLD else 1.0
-                            final_cost = base_cost * airline_multiplier * frequency_multiplier
-                            
-                            delay_range = config.HIGH_DELAY_RANGE if airline_code in config.DELAY_PRONE_AIRLINES else config.LOW_DELAY_RANGE
-                            simulated_delay = random.randint(*delay_range)
-                            
-                            weights = {"distance": round(distance, 2), "cost": round(final_cost, 2), "delay": simulated_delay}
-                            flight_graph.add_edge(source_iata, dest_iata, weights)
-                            routes_loaded += 1
-                except (ValueError, IndexError):
-                    continue
+        rows = _stream_route_rows(config.ROUTES_FILE, stats)
+        routes = _resolve_direct_routes(rows, flight_graph, stats)
+        if vectorized:
+            pending_routes = [(source_airport.iata, dest_airport.iata, airline_code)
+                              for airline_code, source_airport, dest_airport in routes]
+        else:
+            for airline_code, source_airport, dest_airport in routes:
+                distance = _calculate_haversine_distance(source_airport.lat, source_airport.lon, dest_airport.lat, dest_airport.lon)
+                route_key = (source_airport.iata, dest_airport.iata)
+                route_frequencies[route_key] += 1
+                pending_routes.append((route_key, airline_code, distance, _simulate_delay(airline_code)))
     except FileNotFoundError:
         print(f"Error: {config.ROUTES_FILE} was not found."); return None
-    print(f"✅ Loaded {routes_loaded} routes.")
+
+    # Step 3: Finalize costs now that frequencies are known
+    if vectorized:
+        flight_graph = _emit_vectorized(flight_graph, pending_routes, as_csr)
+    else:
+        flight_graph = _finalize_routes(flight_graph, pending_routes, route_frequencies, as_csr)
+    print(f"✅ Loaded {len(pending_routes)} routes "
+          f"(rejected: {stats['malformed']} malformed, {stats['indirect']} non-direct, {stats['unknown_airport']} unknown airport).")
+    return flight_graph
+
+def _finalize_routes(flight_graph, pending_routes, route_frequencies, as_csr):
+    """Applies the cost model to (route_key, airline, distance, delay) tuples and adds the edges."""
+    if as_csr:
+        return _emit_csr(flight_graph, pending_routes, route_frequencies)
+    for route_key, airline_code, distance, simulated_delay in pending_routes:
+        final_cost = _calculate_cost(distance, airline_code, route_frequencies[route_key])
+        weights = {"distance": round(distance, 2), "cost": round(final_cost, 2), "delay": simulated_delay, "airline": airline_code}
+        flight_graph.add_edge(route_key[0], route_key[1], weights)
+    flight_graph.route_frequencies = route_frequencies
+    return flight_graph
+
+def _emit_csr(flight_graph, pending_routes, route_frequencies):
+    """Finalizes pending routes directly into CSR edge columns."""
+    airports = list(flight_graph.airports.values())
+    ids = {airport.iata: i for i, airport in enumerate(airports)}
+    sources, targets = array('i'), array('i')
+    weights = {metric: array('d') for metric in METRICS}
+    airlines = []
+    for route_key, airline_code, distance, simulated_delay in pending_routes:
+        final_cost = _calculate_cost(distance, airline_code, route_frequencies[route_key])
+        sources.append(ids[route_key[0]])
+        targets.append(ids[route_key[1]])
+        airlines.append(airline_code)
+        weights['distance'].append(round(distance, 2))
+        weights['cost'].append(round(final_cost, 2))
+        weights['delay'].append(simulated_delay)
+    return CSRGraph.from_edges(airports, sources, targets, weights, airlines)
+
+def _emit_vectorized(flight_graph, pending_routes, as_csr):
+    """Computes all edge weights in one NumPy pass and emits a Graph or CSRGraph."""
+    # NumPy is only needed on this path, so the scalar loader keeps working without it.
+    from edge_weights import compute_edge_weights
+
+    airports = list(flight_graph.airports.values())
+    ids = {airport.iata: i for i, airport in enumerate(airports)}
+    sources = array('i', (ids[source_iata] for source_iata, _, _ in pending_routes))
+    targets = array('i', (ids[dest_iata] for _, dest_iata, _ in pending_routes))
+    airlines = [airline_code for _, _, airline_code in pending_routes]
+    lat = array('d', (airport.lat for airport in airports))
+    lon = array('d', (airport.lon for airport in airports))
+    weights = compute_edge_weights(lat, lon, sources, targets, airlines)
+
+    if as_csr:
+        return CSRGraph.from_edges(airports, sources, targets, weights, airlines)
+    distance, cost, delay = (weights[metric].tolist() for metric in METRICS)
+    for e, (source_iata, dest_iata, airline_code) in enumerate(pending_routes):
+        flight_graph.add_edge(source_iata, dest_iata, {"distance": distance[e], "cost": cost[e], "delay": int(delay[e]), "airline": airline_code})
     return flight_graph
\ No newline at end of file
@@ -0,0 +1,90 @@
+# delay_scenarios.py
+
+import numpy as np
+from edge_weights import airline_column
+import config
+
+class DelayScenarioGenerator:
+    """
+    Seeded Monte Carlo generator of (scenarios x edges) delay matrices.
+
+    Each edge draws its delay uniformly from its airline's (min, max) range:
+    AIRLINE_DELAY_RANGES when the airline has an override, else the
+    HIGH/LOW ranges used by the loader. Scenarios are produced in fixed-size
+    blocks, each seeded from (seed, block index), so any block can be
+    regenerated on its own and the full matrix never has to sit in memory.
+    Delays are stored as uint16 minutes.
+    """
+    def __init__(self, airline_codes, seed=None, block_size=None):
+        airline_codes = np.asarray(airline_codes)
+        self.seed = config.SCENARIO_SEED if seed is None else seed
+        self.block_size = block_size or config.SCENARIO_BLOCK_SIZE
+        self.num_edges = len(airline_codes)
+
+        is_prone = np.isin(airline_codes, list(config.DELAY_PRONE_AIRLINES))
+        low = np.where(is_prone, config.HIGH_DELAY_RANGE[0], config.LOW_DELAY_RANGE[0])
+        high = np.where(is_prone, config.HIGH_DELAY_RANGE[1], config.LOW_DELAY_RANGE[1])
+        for airline_code, (airline_low, airline_high) in config.AIRLINE_DELAY_RANGES.items():
+            mask = airline_codes == airline_code
+            low[mask], high[mask] = airline_low, airline_high
+        self.low = low.astype(np.uint16)
+        self.span = (high - low + 1).astype(np.uint16)
+
+    @classmethod
+    def from_csr(cls, csr_graph, seed=None, block_size=None):
+        """Builds a generator over the edges of a CSRGraph, in CSR edge order."""
+        return cls(airline_column(csr_graph), seed, block_size)
+
+    def block(self, block_index):
+        """Returns block number block_index as a (block_size x edges) uint16 matrix."""
+        rng = np.random.default_rng([self.seed, block_index])
+        draws = rng.random((self.block_size, self.num_edges), dtype=np.float32)
+        offsets = np.minimum((draws * self.span).astype(np.uint16), self.span - 1)
+        return self.low + offsets
+
+    def iter_blocks(self, num_scenarios):
+        """
+        Yields (first_scenario, matrix) blocks covering num_scenarios
+        scenarios; the last block is trimmed to size.
+        """
+        for block_index, start in enumerate(range(0, num_scenarios, self.block_size)):
+            matrix = self.block(block_index)
+            yield start, matrix[:min(self.block_size, num_scenarios - start)]
+
+    def matrix(self, num_scenarios):
+        """Materializes the full (scenarios x edges) matrix; only for small runs."""
+        return np.concatenate([m for _, m in self.iter_blocks(num_scenarios)])
+
+    def path_delays(self, edge_indices, num_scenarios):
+        """
+        Total delay of a path (given as CSR edge indices) in every scenario.
+
+        Returns:
+            An int32 array of length num_scenarios.
+        """
+        edge_indices = np.asarray(edge_indices, dtype=np.int64)
+        totals = np.empty(num_scenarios, dtype=np.int32)
+        for start, matrix in self.iter_blocks(num_scenarios):
+            totals[start:start + len(matrix)] = matrix[:, edge_indices].sum(axis=1, dtype=np.int32)
+        return totals
+
+    def edge_statistics(self, num_scenarios):
+        """
+        Streams all scenarios once and returns per-edge mean, standard
+        deviation and maximum delay as a dict of float arrays (all zero
+        when there are no scenarios).
+        """
+        if num_scenarios <= 0:
+            zeros = np.zeros(self.num_edges, dtype=np.float64)
+            return {'mean': zeros, 'std': zeros.copy(), 'max': zeros.copy()}
+        total = np.zeros(self.num_edges, dtype=np.float64)
+        total_sq = np.zeros(self.num_edges, dtype=np.float64)
+        maximum = np.zeros(self.num_edges, dtype=np.uint16)
+        for _, matrix in self.iter_blocks(num_scenarios):
+            block = matrix.astype(np.float64)
+            total += block.sum(axis=0)
+            total_sq += (block * block).sum(axis=0)
+            np.maximum(maximum, matrix.max(axis=0), out=maximum)
+        mean = total / num_scenarios
+        std = np.sqrt(np.maximum(total_sq / num_scenarios - mean * mean, 0.0))
+        return {'mean': mean, 'std': std, 'max': maximum.astype(np.float64)}
@@ -0,0 +1,86 @@
+# edge_weights.py
+
+import numpy as np
+import config
+
+EARTH_RADIUS_KM = 6371.0
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Vectorized great-circle distance in kilometers over coordinate columns."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(c, dtype=np.float64)) for c in (lat1, lon1, lat2, lon2))
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+def route_frequencies(sources, targets, num_nodes):
+    """Returns, for every edge, how many edges share its (source, dest) pair."""
+    keys = np.asarray(sources, dtype=np.int64) * num_nodes + np.asarray(targets, dtype=np.int64)
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    return counts[inverse]
+
+def calculate_costs(distance, airline_codes, frequencies):
+    """Applies the config cost model to whole columns of routes at once."""
+    is_budget = np.isin(airline_codes, list(config.BUDGET_AIRLINES))
+    airline_multiplier = np.where(is_budget, config.BUDGET_AIRLINE_MULTIPLIER, config.STANDARD_AIRLINE_MULTIPLIER)
+    frequency_multiplier = np.where(np.asarray(frequencies) > config.FREQUENT_ROUTE_THRESHOLD, config.FREQUENCY_DISCOUNT_MULTIPLIER, 1.0)
+    base_cost = config.BASE_COST + (distance * config.COST_PER_KM)
+    return base_cost * airline_multiplier * frequency_multiplier
+
+def simulate_delays(airline_codes, rng=None):
+    """Draws one delay per route from the config delay ranges (inclusive bounds)."""
+    rng = rng if rng is not None else np.random.default_rng()
+    is_prone = np.isin(airline_codes, list(config.DELAY_PRONE_AIRLINES))
+    low = np.where(is_prone, config.HIGH_DELAY_RANGE[0], config.LOW_DELAY_RANGE[0])
+    high = np.where(is_prone, config.HIGH_DELAY_RANGE[1], config.LOW_DELAY_RANGE[1])
+    return rng.integers(low, high + 1)
+
+def compute_edge_weights(lat, lon, sources, targets, airline_codes, delays=None, rng=None):
+    """
+    Computes distance, cost and delay for every route in one NumPy pass.
+
+    Args:
+        lat, lon: Per-airport coordinate columns, indexed by airport id.
+        sources, targets: Per-edge airport ids.
+        airline_codes: Per-edge airline codes.
+        delays: Existing per-edge delays to keep; drawn fresh when None.
+
+    Returns:
+        A dict of per-edge arrays keyed by metric, rounded like the scalar loader.
+    """
+    lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+    sources, targets = np.asarray(sources, dtype=np.int64), np.asarray(targets, dtype=np.int64)
+    airline_codes = np.asarray(airline_codes)
+
+    distance = haversine_km(lat[sources], lon[sources], lat[targets], lon[targets])
+    frequencies = route_frequencies(sources, targets, len(lat))
+    cost = calculate_costs(distance, airline_codes, frequencies)
+    if delays is None:
+        delays = simulate_delays(airline_codes, rng)
+    return {
+        'distance': np.round(distance, 2),
+        'cost': np.round(cost, 2),
+        'delay': np.asarray(delays, dtype=np.float64),
+    }
+
+def airline_column(csr_graph):
+    """Decodes a CSRGraph's interned airline ids into a per-edge array of airline codes."""
+    if csr_graph.airline_ids is None:
+        raise ValueError("CSRGraph has no airline codes; rebuild it with build_flight_network(as_csr=True).")
+    return np.asarray(csr_graph.airline_codes)[np.asarray(csr_graph.airline_ids, dtype=np.int64)]
+
+def reweight_csr(csr_graph, keep_delays=True, rng=None):
+    """
+    Recomputes every edge weight of a CSRGraph from the current config, e.g.
+    after changing COST_PER_KM or the airline sets. Requires the graph to
+    carry its per-edge airline codes.
+    """
+    airline_codes = airline_column(csr_graph)
+    offsets = np.asarray(csr_graph.offsets, dtype=np.int64)
+    sources = np.repeat(np.arange(csr_graph.num_nodes), np.diff(offsets))
+    delays = csr_graph.weights['delay'] if keep_delays else None
+    weights = compute_edge_weights(csr_graph.lat, csr_graph.lon, sources, csr_graph.targets,
+                                   airline_codes, delays=delays, rng=rng)
+    csr_graph.weights = weights
+    return csr_graph
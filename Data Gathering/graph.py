@@ -1,5 +1,9 @@
 # graph.py
 
+from spatial_index import SpatialIndex
+
+METRICS = ('distance', 'cost', 'delay')
+
 class Airport:
     """A class to represent an airport node with its attributes."""
     def __init__(self, iata, name, city, country, lat, lon):
@@ -19,17 +23,84 @@ class Graph:
     def __init__(self):
         self.adjacency_list = {}
         self.airports = {} # Maps IATA code to Airport object
+        self.route_frequencies = None # Counter of (source, dest) -> direct routes, set by the loader
+        self.version = 0 # Bumped by every applied route delta
+        self.changed_routes = {} # Maps version to the (source, dest) pairs that delta touched
+        self._spatial_index = None
+        self._collapsed = None # (version, Graph) cache for collapsed()
 
     def add_node(self, airport):
         """Adds an airport node to the graph."""
         if airport.iata not in self.adjacency_list:
             self.adjacency_list[airport.iata] = []
             self.airports[airport.iata] = airport
+            self._spatial_index = None
 
     def add_edge(self, source_iata, dest_iata, weights):
         """Adds a directed edge with weights between two airports."""
         if source_iata in self.adjacency_list and dest_iata in self.adjacency_list:
             self.adjacency_list[source_iata].append((dest_iata, weights))
+            self._collapsed = None
+
+    def apply_delta(self, delta_file):
+        """
+        Applies a file of added and removed routes in place and bumps the
+        graph version. See route_delta.apply_route_delta for the file format.
+
+        Time Complexity: O(D * deg) for a delta of D routes.
+        """
+        # Imported here because route_delta reuses the loader's cost model, and the loader imports this module.
+        from route_delta import apply_route_delta
+        return apply_route_delta(self, delta_file)
+
+    def changes_since(self, version):
+        """Returns every (source, dest) pair changed by deltas after the given version."""
+        changed = set()
+        for v in range(version + 1, self.version + 1):
+            changed |= self.changed_routes.get(v, set())
+        return changed
+
+    def collapsed(self):
+        """
+        Returns a view of the network with one edge per (source, dest) pair.
+
+        Each collapsed edge keeps the minimum of every metric under its plain
+        name, so shortest-path code runs on it unchanged and finds the same
+        optimal values, plus "<metric>_mean", "<metric>_max", "carriers" and
+        "count" over the parallel edges it replaces. The view is cached until
+        the graph changes.
+
+        Time Complexity: O(V + E) to build, O(1) when cached.
+        """
+        if self._collapsed is not None and self._collapsed[0] == self.version:
+            return self._collapsed[1]
+
+        collapsed = Graph()
+        for airport in self.airports.values():
+            collapsed.add_node(airport)
+        for source_iata, edges in self.adjacency_list.items():
+            parallel = {} # Maps dest to the weights of every edge to it, in first-seen order
+            for dest_iata, w in edges:
+                parallel.setdefault(dest_iata, []).append(w)
+            for dest_iata, group in parallel.items():
+                weights = {}
+                for metric in METRICS:
+                    values = [w[metric] for w in group]
+                    weights[metric] = min(values)
+                    weights[f"{metric}_mean"] = sum(values) / len(values)
+                    weights[f"{metric}_max"] = max(values)
+                weights["carriers"] = sorted({w["airline"] for w in group if "airline" in w})
+                weights["count"] = len(group)
+                collapsed.adjacency_list[source_iata].append((dest_iata, weights))
+
+        self._collapsed = (self.version, collapsed)
+        return collapsed
+
+    def spatial_index(self):
+        """Returns the SpatialIndex over all airports, building it once on first use."""
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(self.airports.values())
+        return self._spatial_index
 
     def get_airport(self, iata):
         """Retrieves an Airport object by its IATA code."""
@@ -1,11 +1,11 @@
 # main.py
-from data_loader import build_flight_network
+from snapshot import load_flight_network
 
 def main():
     """Main function to run the GlobalAir application."""
     print("--- ✈️  Starting GlobalAir Logistics System ---")
     
-    flight_network = build_flight_network()
+    flight_network = load_flight_network()
 
     if flight_network:
         print("\n" + "="*50)
@@ -0,0 +1,200 @@
+# parallel_loader.py
+
+import csv
+import io
+import os
+import random
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from graph import Graph
+from csr_graph import CSRGraph, METRICS
+from data_loader import (_parse_airport_row, _resolve_direct_routes, _calculate_haversine_distance,
+                         _calculate_cost, _simulate_delay, _report_progress)
+from edge_weights import route_frequencies
+import config
+
+# Per-route columns a route worker returns, with their array typecodes.
+_ROUTE_COLUMNS = {'sources': 'i', 'targets': 'i', 'airline_ids': 'i', 'distance': 'd',
+                  'cost': 'd', 'discounted_cost': 'd', 'delay': 'i'}
+
+# Route workers resolve IATA codes against the airports loaded in step 1.
+# Pickling that table into every chunk task would cost more than parsing a
+# small chunk, so the pool initializer stores it, with its id lookup, once.
+_worker_graph = None
+_worker_ids = None # IATA code -> airport id, in graph order
+
+def split_line_ranges(path, num_chunks):
+    """
+    Splits a file into at most num_chunks byte ranges that start and end on
+    line boundaries. Assumes no quoted field spans a newline, which holds for
+    the OpenFlights files.
+    """
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, num_chunks):
+            f.seek(size * i // num_chunks)
+            f.readline() # Skip to the start of the next full line
+            position = f.tell()
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def _read_rows(path, start, end):
+    """Parses the CSV rows inside one byte range."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+
+def _parse_airport_chunk(task):
+    """Worker: returns the valid Airport objects in one (path, start, end) byte range, in file order."""
+    rows = _read_rows(*task)
+    return [airport for airport in map(_parse_airport_row, rows) if airport]
+
+def _init_route_worker(flight_graph):
+    global _worker_graph, _worker_ids
+    _worker_graph = flight_graph
+    _worker_ids = {iata: i for i, iata in enumerate(flight_graph.airports)}
+
+def _parse_route_chunk(task):
+    """
+    Worker: parses one (path, start, end, seed) byte range of routes.dat
+    and computes the weights of its routes, drawing delays from a
+    random.Random(seed) so every chunk is reproducible on its own.
+
+    The frequency discount depends on counts over the whole file, so each
+    route's cost is returned both with and without it. Columns are
+    compact arrays, which pickle as raw bytes; airlines are interned
+    against the chunk's own code list.
+
+    Returns:
+        A tuple (columns, airline_codes, stats), where columns maps
+        'sources', 'targets', 'airline_ids', 'distance', 'cost',
+        'discounted_cost' and 'delay' to per-route arrays.
+    """
+    path, start, end, seed = task
+    stats = {'rows': 0, 'malformed': 0, 'indirect': 0, 'unknown_airport': 0}
+    rows = _read_rows(path, start, end)
+
+    def counted(rows):
+        for row in rows:
+            stats['rows'] += 1
+            yield row
+
+    rng = random.Random(seed)
+    columns = {name: array(typecode) for name, typecode in _ROUTE_COLUMNS.items()}
+    code_ids = {}
+    frequent = config.FREQUENT_ROUTE_THRESHOLD + 1
+    for airline_code, source_airport, dest_airport in _resolve_direct_routes(counted(rows), _worker_graph, stats):
+        distance = _calculate_haversine_distance(source_airport.lat, source_airport.lon, dest_airport.lat, dest_airport.lon)
+        columns['sources'].append(_worker_ids[source_airport.iata])
+        columns['targets'].append(_worker_ids[dest_airport.iata])
+        columns['airline_ids'].append(code_ids.setdefault(airline_code, len(code_ids)))
+        columns['distance'].append(round(distance, 2))
+        columns['cost'].append(round(_calculate_cost(distance, airline_code, 0), 2))
+        columns['discounted_cost'].append(round(_calculate_cost(distance, airline_code, frequent), 2))
+        columns['delay'].append(_simulate_delay(airline_code, rng))
+    return columns, list(code_ids), stats
+
+def _chunk_tasks(path, workers):
+    """
+    Splits path into (path, start, end) worker tasks. The path is made
+    absolute and travels with each task, since workers started with
+    `spawn` re-import config and never see the parent's settings.
+    """
+    path = os.path.abspath(path)
+    num_chunks = max(workers, os.path.getsize(path) // config.PARSE_CHUNK_BYTES + 1)
+    return [(path, start, end) for start, end in split_line_ranges(path, num_chunks)]
+
+def build_flight_network_parallel(workers=None, as_csr=False):
+    """
+    Builds the same flight network as build_flight_network, parsing both
+    source files as line-aligned byte ranges on a process pool.
+
+    Workers parse the rows, resolve their airports and compute every
+    weight, returning compact per-chunk columns. The parent only
+    concatenates them in file order, picks each route's discounted or
+    full cost from the whole-file route counts, and assembles the graph.
+    Distances and costs match the serial loader edge for edge. Delays are
+    drawn per chunk from config.PARSE_DELAY_SEED, so they are reproducible
+    for a given file and worker count but differ from the serial loader's.
+    """
+    workers = workers or config.PARSE_WORKERS or os.cpu_count() or 1
+    flight_graph = Graph()
+
+    # Step 1: Load Airports
+    print(f"✈️  Loading airports on {workers} workers...")
+    try:
+        airport_tasks = _chunk_tasks(config.AIRPORTS_FILE, workers)
+    except FileNotFoundError:
+        print(f"Error: {config.AIRPORTS_FILE} not found."); return None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for airports in pool.map(_parse_airport_chunk, airport_tasks):
+            for airport in airports:
+                flight_graph.add_node(airport)
+    print(f"✅ Loaded {len(flight_graph.airports)} airports.")
+
+    # Step 2: Parse Routes and merge the chunk columns in file order
+    print(f"✈️  Loading routes on {workers} workers...")
+    try:
+        route_tasks = [task + (config.PARSE_DELAY_SEED * 1_000_003 + i,)
+                       for i, task in enumerate(_chunk_tasks(config.ROUTES_FILE, workers))]
+    except FileNotFoundError:
+        print(f"Error: {config.ROUTES_FILE} was not found."); return None
+    start_time = time.perf_counter()
+    stats = Counter()
+    merged = {name: array(typecode) for name, typecode in _ROUTE_COLUMNS.items()}
+    code_ids = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_route_worker, initargs=(flight_graph,)) as pool:
+        for columns, airline_codes, chunk_stats in pool.map(_parse_route_chunk, route_tasks):
+            stats.update(chunk_stats)
+            # Re-intern the chunk's airline ids against the codes seen so far.
+            remap = [code_ids.setdefault(code, len(code_ids)) for code in airline_codes]
+            columns['airline_ids'] = array('i', map(remap.__getitem__, columns['airline_ids']))
+            for name, column in columns.items():
+                merged[name].extend(column)
+            _report_progress(stats, start_time)
+
+    # Step 3: Apply the frequency discount now that whole-file counts are known
+    flight_graph = _emit_columns(flight_graph, merged, list(code_ids), as_csr)
+    print(f"✅ Loaded {len(merged['sources'])} routes "
+          f"(rejected: {stats['malformed']} malformed, {stats['indirect']} non-direct, {stats['unknown_airport']} unknown airport).")
+    return flight_graph
+
+def _emit_columns(flight_graph, columns, airline_codes, as_csr):
+    """Finalizes merged route columns into a Graph, or a CSRGraph built with NumPy."""
+    airports = list(flight_graph.airports.values())
+    sources = np.frombuffer(columns['sources'], dtype=np.int32)
+    targets = np.frombuffer(columns['targets'], dtype=np.int32)
+    frequent = route_frequencies(sources, targets, len(airports)) > config.FREQUENT_ROUTE_THRESHOLD
+    cost = np.where(frequent, np.frombuffer(columns['discounted_cost']), np.frombuffer(columns['cost']))
+    distance = np.frombuffer(columns['distance'])
+    delay = np.frombuffer(columns['delay'], dtype=np.int32)
+    airline_ids = np.frombuffer(columns['airline_ids'], dtype=np.int32)
+
+    if not as_csr:
+        codes = [airline_codes[i] for i in airline_ids.tolist()]
+        for s, t, d, c, dl, code in zip(sources.tolist(), targets.tolist(), distance.tolist(), cost.tolist(), delay.tolist(), codes):
+            flight_graph.add_edge(airports[s].iata, airports[t].iata, {"distance": d, "cost": c, "delay": dl, "airline": code})
+        return flight_graph
+
+    # Same layout as CSRGraph.from_edges: edges grouped by source in input
+    # order, airlines interned in order of first appearance.
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(len(airports) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(airports)), out=offsets[1:])
+    sorted_airlines = airline_ids[order]
+    present, first = np.unique(sorted_airlines, return_index=True)
+    by_appearance = present[np.argsort(first)]
+    renumber = np.zeros(len(airline_codes), dtype=np.int32)
+    renumber[by_appearance] = np.arange(len(by_appearance), dtype=np.int32)
+    weights = {'distance': distance[order], 'cost': cost[order], 'delay': delay[order].astype(np.float64)}
+    return CSRGraph(airports, array('q', offsets.tobytes()), array('i', targets[order].tobytes()),
+                    {metric: array('d', weights[metric].tobytes()) for metric in METRICS},
+                    airline_ids=array('i', renumber[sorted_airlines].tobytes()),
+                    airline_codes=[airline_codes[i] for i in by_appearance.tolist()])
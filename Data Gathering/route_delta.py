@@ -0,0 +1,115 @@
+# route_delta.py
+
+import csv
+from collections import Counter
+from data_loader import _resolve_direct_routes, _calculate_haversine_distance, _calculate_cost, _simulate_delay
+import config
+
+def read_route_delta(delta_file, flight_graph):
+    """
+    Parses a route delta file against the airports of a graph.
+
+    Each line is a routes.dat row prefixed with '+' (route added) or '-'
+    (route removed), e.g. "+,BA,1355,LHR,507,JFK,3797,,0,744". Rows that are
+    not direct or name unknown airports are dropped like in the loader.
+
+    Returns:
+        A tuple (added, removed, stats) where added and removed are lists of
+        (airline_code, source Airport, dest Airport).
+    """
+    stats = {'rows': 0, 'malformed': 0, 'indirect': 0, 'unknown_airport': 0}
+    rows = {'+': [], '-': []}
+    with open(delta_file, 'r', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            stats['rows'] += 1
+            if row and row[0] in rows:
+                rows[row[0]].append(row[1:])
+            else:
+                stats['malformed'] += 1
+    added = list(_resolve_direct_routes(rows['+'], flight_graph, stats))
+    removed = list(_resolve_direct_routes(rows['-'], flight_graph, stats))
+    return added, removed, stats
+
+def _reprice(flight_graph, source_iata, dest_iata, frequency):
+    """Recomputes the cost of every edge on one (source, dest) pair."""
+    source, dest = flight_graph.get_airport(source_iata), flight_graph.get_airport(dest_iata)
+    distance = _calculate_haversine_distance(source.lat, source.lon, dest.lat, dest.lon)
+    for edge_dest, w in flight_graph.adjacency_list[source_iata]:
+        if edge_dest != dest_iata:
+            continue
+        if 'airline' not in w:
+            raise ValueError("Edges carry no airline code; rebuild the graph from the source files.")
+        w['cost'] = round(_calculate_cost(distance, w['airline'], frequency), 2)
+
+def apply_route_delta(flight_graph, delta_file):
+    """
+    Adds and removes the routes listed in a delta file, touching only the
+    affected (source, dest) pairs.
+
+    New edges get fresh distance, cost and delay weights. When a pair's route
+    count crosses FREQUENT_ROUTE_THRESHOLD, the cost of its other edges is
+    recomputed so the frequency discount is applied or lifted. The graph
+    version is bumped and the changed pairs recorded under it.
+
+    Returns:
+        A summary dict with the new version, counts, and the changed pairs.
+    """
+    added, removed, stats = read_route_delta(delta_file, flight_graph)
+
+    # Graphs loaded without frequencies (e.g. from a snapshot) count them once.
+    if flight_graph.route_frequencies is None:
+        flight_graph.route_frequencies = Counter(
+            (source_iata, dest_iata)
+            for source_iata, edges in flight_graph.adjacency_list.items()
+            for dest_iata, _ in edges
+        )
+    frequencies = flight_graph.route_frequencies
+    previous = {}
+
+    removed_count = 0
+    for airline_code, source, dest in removed:
+        route_key = (source.iata, dest.iata)
+        edges = flight_graph.adjacency_list[source.iata]
+        for i, (dest_iata, w) in enumerate(edges):
+            if dest_iata == dest.iata and w.get('airline') == airline_code:
+                previous.setdefault(route_key, frequencies[route_key])
+                del edges[i]
+                frequencies[route_key] -= 1
+                removed_count += 1
+                break
+
+    for airline_code, source, dest in added:
+        route_key = (source.iata, dest.iata)
+        previous.setdefault(route_key, frequencies[route_key])
+        frequencies[route_key] += 1
+
+    for airline_code, source, dest in added:
+        route_key = (source.iata, dest.iata)
+        distance = _calculate_haversine_distance(source.lat, source.lon, dest.lat, dest.lon)
+        final_cost = _calculate_cost(distance, airline_code, frequencies[route_key])
+        weights = {"distance": round(distance, 2), "cost": round(final_cost, 2), "delay": _simulate_delay(airline_code), "airline": airline_code}
+        flight_graph.add_edge(source.iata, dest.iata, weights)
+
+    repriced = 0
+    threshold = config.FREQUENT_ROUTE_THRESHOLD
+    for route_key, old_frequency in previous.items():
+        new_frequency = frequencies[route_key]
+        if (old_frequency > threshold) != (new_frequency > threshold):
+            _reprice(flight_graph, route_key[0], route_key[1], new_frequency)
+            repriced += 1
+        if new_frequency == 0:
+            del frequencies[route_key]
+
+    flight_graph.version += 1
+    changed = set(previous)
+    flight_graph.changed_routes[flight_graph.version] = changed
+    print(f"✅ Applied delta v{flight_graph.version}: +{len(added)} / -{removed_count} routes, "
+          f"{repriced} routes repriced, {len(removed) - removed_count} removals not found.")
+    return {
+        'version': flight_graph.version,
+        'added': len(added),
+        'removed': removed_count,
+        'repriced': repriced,
+        'changed_routes': changed,
+        'stats': stats,
+    }
@@ -0,0 +1,196 @@
+# snapshot.py
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+from graph import Graph, Airport
+from csr_graph import CSRGraph
+from data_loader import build_flight_network
+import config
+
+# File layout: MAGIC | header length (uint64) | JSON header | padding | arrays.
+# Every array starts on an 8-byte boundary so it can be cast straight out of the mmap.
+MAGIC = b'GASNAP02'
+_PREFIX = struct.Struct('<8sQ')
+_ALIGN = 8
+
+# Config values that change the weights stored on each edge.
+_CONFIG_KEYS = (
+    'BUDGET_AIRLINES', 'DELAY_PRONE_AIRLINES', 'BASE_COST', 'COST_PER_KM',
+    'BUDGET_AIRLINE_MULTIPLIER', 'STANDARD_AIRLINE_MULTIPLIER',
+    'FREQUENCY_DISCOUNT_MULTIPLIER', 'FREQUENT_ROUTE_THRESHOLD',
+    'HIGH_DELAY_RANGE', 'LOW_DELAY_RANGE',
+)
+
+# (name, array typecode) in the order they are written to disk.
+_ARRAYS = (
+    ('lat', 'd'), ('lon', 'd'),
+    ('offsets', 'q'), ('targets', 'i'),
+    ('distance', 'd'), ('cost', 'd'), ('delay', 'i'),
+    ('airline_ids', 'i'),
+)
+
+def compute_snapshot_key():
+    """Hashes the two input files and the cost parameters into one cache key."""
+    digest = hashlib.sha256()
+    for path in (config.AIRPORTS_FILE, config.ROUTES_FILE):
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    params = {}
+    for key in _CONFIG_KEYS:
+        value = getattr(config, key)
+        params[key] = sorted(value) if isinstance(value, (set, frozenset)) else value
+    digest.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+def write_snapshot(flight_graph, key, path=None):
+    """Compiles a built Graph or CSRGraph into a binary snapshot file."""
+    path = path or config.SNAPSHOT_FILE
+    csr = flight_graph if isinstance(flight_graph, CSRGraph) else CSRGraph.from_graph(flight_graph)
+    columns = {
+        'lat': array('d', csr.lat), 'lon': array('d', csr.lon),
+        'offsets': array('q', csr.offsets), 'targets': array('i', csr.targets),
+        'distance': array('d', csr.weights['distance']), 'cost': array('d', csr.weights['cost']),
+        'delay': array('i', map(int, csr.weights['delay'])),
+        'airline_ids': array('i', csr.airline_ids if csr.airline_ids is not None else ()),
+    }
+
+    header = {
+        'key': key,
+        'airports': [[a.iata, a.name, a.city, a.country] for a in csr.airports],
+        # Only the small code table goes in the header; the per-edge ids are mapped like the weights.
+        'airline_codes': csr.airline_codes,
+        'lengths': {name: len(columns[name]) for name, _ in _ARRAYS},
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    body_start = _PREFIX.size + len(header_bytes)
+    padding = -body_start % _ALIGN
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * padding)
+        for name, _ in _ARRAYS:
+            data = columns[name].tobytes()
+            f.write(data)
+            f.write(b'\0' * (-len(data) % _ALIGN))
+    os.replace(tmp_path, path)
+
+def read_snapshot(path=None):
+    """
+    Memory-maps a snapshot file.
+
+    Returns:
+        A tuple (header, arrays) where arrays maps each column name to a
+        memoryview over the mapped file, or (None, None) if the file is
+        missing or not a snapshot.
+    """
+    path = path or config.SNAPSHOT_FILE
+    try:
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None, None
+
+    # A truncated or corrupt file is treated like a missing one so the caller rebuilds it.
+    try:
+        magic, header_len = _PREFIX.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError("not a snapshot")
+        header = json.loads(mm[_PREFIX.size:_PREFIX.size + header_len])
+        pos = _PREFIX.size + header_len
+        pos += -pos % _ALIGN
+        spans = []
+        for name, code in _ARRAYS:
+            nbytes = header['lengths'][name] * array(code).itemsize
+            spans.append((name, code, pos, nbytes))
+            pos += nbytes + (-nbytes % _ALIGN)
+        if pos > len(mm):
+            raise ValueError("snapshot is truncated")
+    except (struct.error, ValueError, KeyError, TypeError):
+        mm.close()
+        return None, None
+
+    view = memoryview(mm)
+    arrays = {name: view[start:start + nbytes].cast(code) for name, code, start, nbytes in spans}
+    return header, arrays
+
+def close_snapshot(arrays):
+    """
+    Releases the column views returned by read_snapshot and unmaps the
+    file. Windows cannot replace a file that is still mapped, so this must
+    run before the snapshot is rewritten.
+    """
+    mm = None
+    for column in arrays.values():
+        mm = column.obj
+        column.release()
+    if mm is not None:
+        mm.close()
+
+def graph_from_snapshot(header, arrays):
+    """Rebuilds a Graph from the columns of a mapped snapshot."""
+    flight_graph = Graph()
+    lat, lon = arrays['lat'].tolist(), arrays['lon'].tolist()
+    iatas = []
+    for i, (iata, name, city, country) in enumerate(header['airports']):
+        flight_graph.add_node(Airport(iata, name, city, country, lat[i], lon[i]))
+        iatas.append(iata)
+
+    offsets = arrays['offsets'].tolist()
+    targets = arrays['targets'].tolist()
+    distance, cost, delay = arrays['distance'].tolist(), arrays['cost'].tolist(), arrays['delay'].tolist()
+    airline_codes = header['airline_codes']
+    airline_ids = arrays['airline_ids'].tolist()
+    for i, iata in enumerate(iatas):
+        edges = flight_graph.adjacency_list[iata]
+        for e in range(offsets[i], offsets[i + 1]):
+            weights = {"distance": distance[e], "cost": cost[e], "delay": delay[e]}
+            if airline_codes is not None:
+                weights["airline"] = airline_codes[airline_ids[e]]
+            edges.append((iatas[targets[e]], weights))
+    return flight_graph
+
+def csr_from_snapshot(header, arrays):
+    """Wraps the mapped snapshot columns in a CSRGraph without copying them."""
+    lat, lon = arrays['lat'], arrays['lon']
+    airports = [Airport(iata, name, city, country, lat[i], lon[i])
+                for i, (iata, name, city, country) in enumerate(header['airports'])]
+    weights = {metric: arrays[metric] for metric in ('distance', 'cost', 'delay')}
+    airline_codes = header['airline_codes']
+    airline_ids = arrays['airline_ids'] if airline_codes is not None else None
+    return CSRGraph(airports, arrays['offsets'], arrays['targets'], weights, lat, lon, airline_ids, airline_codes)
+
+def load_flight_network(path=None, as_csr=False):
+    """
+    Loads the flight network from the snapshot cache, rebuilding it from the
+    source files when they (or the cost parameters) have changed.
+    """
+    try:
+        key = compute_snapshot_key()
+    except FileNotFoundError as e:
+        print(f"Error: {e.filename} not found."); return None
+
+    header, arrays = read_snapshot(path)
+    if header is None or header['key'] != key:
+        if header is not None:
+            close_snapshot(arrays)
+        print("... Snapshot missing or stale, rebuilding ...")
+        flight_graph = build_flight_network(as_csr=as_csr)
+        if flight_graph:
+            write_snapshot(flight_graph, key, path)
+            print("✅ Snapshot written.")
+        return flight_graph
+
+    print("⚡ Loaded flight network from snapshot.")
+    if as_csr:
+        return csr_from_snapshot(header, arrays)
+    # The Graph copies every column, so the mapping is not needed afterwards.
+    flight_graph = graph_from_snapshot(header, arrays)
+    close_snapshot(arrays)
+    return flight_graph
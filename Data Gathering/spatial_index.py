@@ -0,0 +1,249 @@
+# spatial_index.py
+
+import heapq
+from math import radians, sin, cos, asin, sqrt, pi
+
+EARTH_RADIUS_KM = 6371.0
+
+# Average airports per grid cell in the batch queries.
+CELL_POINTS = 4
+
+def _unit_vector(lat, lon):
+    """Maps a latitude/longitude pair to a point on the unit sphere."""
+    lat, lon = radians(lat), radians(lon)
+    return (cos(lat) * cos(lon), cos(lat) * sin(lon), sin(lat))
+
+def _chord_to_km(chord_sq):
+    """Converts a squared chord length on the unit sphere to great-circle km."""
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(chord_sq) / 2))
+
+def _km_to_chord_sq(km):
+    """Converts a great-circle distance in km to a squared unit-sphere chord."""
+    angle = min(km / EARTH_RADIUS_KM, pi)
+    return (2 * sin(angle / 2)) ** 2
+
+class SpatialIndex:
+    """
+    k-d tree over airport positions on the unit sphere.
+
+    Straight-line (chord) distance between unit vectors grows monotonically
+    with great-circle distance, so an ordinary 3-D k-d tree answers
+    great-circle nearest-neighbour and radius queries exactly, with no
+    distortion near the poles or the antimeridian.
+
+    Time Complexity: O(n log^2 n) to build, ~O(log n + k) per query.
+    """
+    def __init__(self, airports):
+        self.airports = list(airports)
+        self.points = [_unit_vector(a.lat, a.lon) for a in self.airports]
+        # The tree is implicit: the segment order[lo:hi] has its splitting
+        # point at mid = (lo + hi) // 2 and splits on axis depth % 3.
+        self._order = list(range(len(self.points)))
+        self._build(0, len(self._order), 0)
+        self._index = {a.iata: i for i, a in enumerate(self.airports)}
+        self._grid = None
+
+    def _build(self, lo, hi, depth):
+        if hi - lo <= 1:
+            return
+        axis = depth % 3
+        self._order[lo:hi] = sorted(self._order[lo:hi], key=lambda i: self.points[i][axis])
+        mid = (lo + hi) // 2
+        self._build(lo, mid, depth + 1)
+        self._build(mid + 1, hi, depth + 1)
+
+    def _search(self, query, lo, hi, depth, visit, bound):
+        """Walks the tree, calling visit(i, dist_sq) on points within bound()."""
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        i = self._order[mid]
+        p = self.points[i]
+        dist_sq = (query[0] - p[0])**2 + (query[1] - p[1])**2 + (query[2] - p[2])**2
+        if dist_sq <= bound():
+            visit(i, dist_sq)
+        diff = query[depth % 3] - p[depth % 3]
+        near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+        self._search(query, near[0], near[1], depth + 1, visit, bound)
+        if diff * diff <= bound():
+            self._search(query, far[0], far[1], depth + 1, visit, bound)
+
+    def nearest(self, lat, lon, k=1):
+        """
+        Finds the k airports closest to a point.
+
+        Returns:
+            A list of (Airport, distance_km) sorted by distance. Empty for k < 1.
+        """
+        if k < 1:
+            return []
+        query = _unit_vector(lat, lon)
+        heap = [] # Max-heap of (-dist_sq, index) holding the best k so far
+
+        def visit(i, dist_sq):
+            if len(heap) < k:
+                heapq.heappush(heap, (-dist_sq, i))
+            elif dist_sq < -heap[0][0]:
+                heapq.heapreplace(heap, (-dist_sq, i))
+
+        def bound():
+            return -heap[0][0] if len(heap) == k else float('inf')
+
+        self._search(query, 0, len(self._order), 0, visit, bound)
+        return [(self.airports[i], _chord_to_km(-d)) for d, i in sorted(heap, reverse=True)]
+
+    def within_radius(self, lat, lon, radius_km):
+        """
+        Finds every airport within radius_km of a point.
+
+        Returns:
+            A list of (Airport, distance_km) sorted by distance.
+        """
+        query = _unit_vector(lat, lon)
+        limit = _km_to_chord_sq(radius_km)
+        found = []
+        self._search(query, 0, len(self._order), 0, lambda i, d: found.append((d, i)), lambda: limit)
+        return [(self.airports[i], _chord_to_km(d)) for d, i in sorted(found)]
+
+    def alternates(self, iata, radius_km):
+        """Lists the other airports within radius_km of an airport, e.g. to divert from a closed hub."""
+        i = self._index.get(iata)
+        if i is None:
+            return []
+        airport = self.airports[i]
+        return [(a, km) for a, km in self.within_radius(airport.lat, airport.lon, radius_km) if a.iata != iata]
+
+    def _cells(self):
+        """
+        Buckets the points into a uniform 3-D grid for the batch queries,
+        built once on first use.
+
+        Cells are sized to hold a few airports each, and points are sorted by
+        cell key so every run of cells along the z axis is one contiguous
+        slice of the sorted arrays.
+        """
+        if self._grid is None:
+            # NumPy is only needed for the batch queries.
+            import numpy as np
+
+            points = np.asarray(self.points, dtype=np.float64).reshape(-1, 3)
+            # The points lie on the sphere, whose area 4*pi is split into
+            # cells of about CELL_POINTS airports each.
+            side = sqrt(4 * pi * CELL_POINTS / max(len(points), 1))
+            size = int(2 / side) + 1
+            cells = np.floor((points + 1) / side).astype(np.int64)
+            keys = (cells[:, 0] * size + cells[:, 1]) * size + cells[:, 2]
+            order = np.argsort(keys, kind='stable')
+            self._grid = (side, size, keys[order], order, points[order])
+        return self._grid
+
+    def _pairs(self, queries, reach):
+        """
+        Pairs each query point with the airports within reach cells of its
+        own cell along every axis.
+
+        Returns:
+            (query rows, sorted-array indices, squared chord distances).
+        """
+        import numpy as np
+
+        side, size, keys, order, points = self._cells()
+        cells = np.floor((queries + 1) / side).astype(np.int64)
+        span = np.arange(-reach, reach + 1)
+        xs, ys = cells[:, 0, None] + span, cells[:, 1, None] + span
+        rows = (xs[:, :, None] * size + ys[:, None, :]) * size
+        # Each (x, y) row of cells is one slice of the sorted keys.
+        low = np.maximum(cells[:, 2] - reach, 0)[:, None, None]
+        high = np.minimum(cells[:, 2] + reach, size - 1)[:, None, None]
+        starts = np.searchsorted(keys, rows + low)
+        lengths = np.searchsorted(keys, rows + high, side='right') - starts
+        inside = ((xs >= 0) & (xs < size))[:, :, None] & ((ys >= 0) & (ys < size))[:, None, :]
+        starts, lengths = starts[inside], lengths[inside]
+        query = np.repeat(np.nonzero(inside)[0], lengths)
+        # Concatenates the slices starts[j]:starts[j] + lengths[j] without a Python loop.
+        index = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        # Summed per axis like _search, rather than 2 - 2 q.p, to keep tiny distances exact.
+        dist_sq = sum((queries[query, axis] - points[index, axis]) ** 2 for axis in range(3))
+        return query, index, dist_sq
+
+    def _unit_vectors(self, coordinates):
+        import numpy as np
+
+        coordinates = np.radians(np.asarray(coordinates, dtype=np.float64).reshape(-1, 2))
+        lat, lon = coordinates[:, 0], coordinates[:, 1]
+        return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+    def _add_hits(self, results, query, index, dist_sq):
+        """Appends (Airport, distance_km) to results[query] for each hit, in the given order."""
+        import numpy as np
+
+        airports = self.airports
+        kms = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(dist_sq) / 2))
+        for q, i, km in zip(query.tolist(), self._cells()[3][index].tolist(), kms.tolist()):
+            results[q].append((airports[i], km))
+
+    def nearest_batch(self, coordinates, k=1, chunk_size=1024):
+        """
+        Answers nearest() for many (lat, lon) points at once with NumPy.
+
+        Each query point is compared only against the airports in the block
+        of grid cells around it. The block grows until the k-th neighbour
+        found is closer than any point outside it.
+
+        Returns:
+            A list with one [(Airport, distance_km), ...] list per query point.
+        """
+        import numpy as np
+
+        queries = self._unit_vectors(coordinates)
+        results = [[] for _ in range(len(queries))]
+        side, size, _, _, points = self._cells()
+        k = min(k, len(points))
+        if k < 1:
+            return results
+        for start in range(0, len(queries), chunk_size):
+            remaining, reach = np.arange(start, min(start + chunk_size, len(queries))), 1
+            while len(remaining):
+                query, index, dist_sq = self._pairs(queries[remaining], reach)
+                by_distance = np.lexsort((dist_sq, query))
+                query, index, dist_sq = query[by_distance], index[by_distance], dist_sq[by_distance]
+                counts = np.bincount(query, minlength=len(remaining))
+                rank = np.arange(len(query)) - np.repeat(np.cumsum(counts) - counts, counts)
+                kth_sq = np.full(len(remaining), np.inf)
+                kth_sq[query[rank == k - 1]] = dist_sq[rank == k - 1]
+                # Any point outside the block is at least reach * side away
+                # along some axis, hence farther than that overall.
+                done = kth_sq <= (reach * side) ** 2 if reach < size else np.ones(len(remaining), dtype=bool)
+                keep = (rank < k) & done[query]
+                self._add_hits(results, remaining[query[keep]], index[keep], dist_sq[keep])
+                # The k-th candidate bounds the k-th neighbour, so a block
+                # reaching that far settles the rest in one more pass.
+                needed = np.sqrt(kth_sq[~done]) / side
+                remaining = remaining[~done]
+                if len(remaining):
+                    reach = int(np.ceil(needed.max())) if np.isfinite(needed).all() else reach * 2
+        return results
+
+    def within_radius_batch(self, coordinates, radius_km, chunk_size=1024):
+        """
+        Answers within_radius() for many (lat, lon) points at once with NumPy.
+
+        Each query point is compared only against the airports in the grid
+        cells the radius can reach.
+
+        Returns:
+            A list with one [(Airport, distance_km), ...] list per query point.
+        """
+        import numpy as np
+
+        queries = self._unit_vectors(coordinates)
+        results = [[] for _ in range(len(queries))]
+        side, size = self._cells()[:2]
+        limit = _km_to_chord_sq(radius_km)
+        reach = min(int(sqrt(limit) / side) + 1, size)
+        for start in range(0, len(queries), chunk_size):
+            query, index, dist_sq = self._pairs(queries[start:start + chunk_size], reach)
+            inside = np.flatnonzero(dist_sq <= limit)
+            inside = inside[np.lexsort((dist_sq[inside], query[inside]))]
+            self._add_hits(results, query[inside] + start, index[inside], dist_sq[inside])
+        return results
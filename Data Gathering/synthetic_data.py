@@ -0,0 +1,100 @@
+# synthetic_data.py
+
+import argparse
+import csv
+import itertools
+import os
+import random
+import string
+
+# Airline codes written to the synthetic routes, including the budget and
+# delay-prone carriers listed in config.
+AIRLINES = ['FR', 'WN', '6E', 'U2', 'DY', 'UA', 'AA', 'DL', 'B6', 'BA', 'LH', 'AF', 'EK', 'QR', 'SQ', 'CX', 'QF', 'NH', 'TK', 'AI']
+EQUIPMENT = ['320', '321', '738', '77W', '789', '333', '359', '388']
+BATCH_SIZE = 100_000
+
+def _iata_codes():
+    """Returns every three-letter IATA code in a fixed shuffled order."""
+    codes = [''.join(c) for c in itertools.product(string.ascii_uppercase, repeat=3)]
+    random.Random(0).shuffle(codes)
+    return codes
+
+def write_airports(path, num_airports, seed=0):
+    """
+    Writes an OpenFlights-format airports.dat with num_airports rows.
+
+    Only 26^3 = 17,576 three-letter IATA codes exist, so airports beyond that
+    are written with a '\\N' IATA code, as real OpenFlights rows without one
+    are, and the loader skips them.
+
+    Returns:
+        The list of (iata, lat, lon) for airports that have an IATA code.
+    """
+    rng = random.Random(seed)
+    codes = _iata_codes()
+    usable = []
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC, lineterminator='\n')
+        for i in range(num_airports):
+            iata = codes[i] if i < len(codes) else '\\N'
+            # Cluster airports around population bands instead of uniformly over the oceans.
+            lat = max(-85.0, min(85.0, rng.gauss(25.0, 25.0)))
+            lon = rng.uniform(-180.0, 180.0)
+            writer.writerow([i + 1, f"Synthetic Airport {i + 1}", f"City {i % 5000}", f"Country {i % 200}",
+                             iata, "\\N", lat, lon, rng.randint(0, 3000), 0, "U", "Etc/UTC", "airport", "Synthetic"])
+            if iata != '\\N':
+                usable.append((iata, lat, lon))
+    return usable
+
+def write_routes(path, airports, num_routes, seed=0):
+    """
+    Writes an OpenFlights-format routes.dat with num_routes rows.
+
+    Airport popularity follows a Zipf-like curve so a few hubs carry many
+    parallel routes and cross FREQUENT_ROUTE_THRESHOLD, about 1% of rows have
+    stops, and about 0.5% reference unknown airports. Rows are generated in
+    batches so files with tens of millions of routes stream to disk.
+    """
+    rng = random.Random(seed + 1)
+    codes = [iata for iata, _, _ in airports]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) ** 0.8 for rank in range(len(codes))))
+    with open(path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        written = 0
+        while written < num_routes:
+            count = min(BATCH_SIZE, num_routes - written)
+            sources = rng.choices(codes, cum_weights=cum_weights, k=count)
+            dests = rng.choices(codes, cum_weights=cum_weights, k=count)
+            lines = []
+            for source, dest in zip(sources, dests):
+                if source == dest:
+                    dest = codes[rng.randrange(len(codes))]
+                roll = rng.random()
+                stops = 1 if roll < 0.01 else 0
+                if roll > 0.995:
+                    dest = 'ZZ9' # Not a valid IATA code, so never a known airport
+                airline_id = rng.randrange(len(AIRLINES))
+                # data_loader reads the carrier code from column 1, so it goes there.
+                lines.append(f"{airline_id + 1},{AIRLINES[airline_id]},{source},0,{dest},0,,{stops},{rng.choice(EQUIPMENT)}\n")
+            f.writelines(lines)
+            written += count
+
+def generate_network(out_dir, num_airports, num_routes, seed=0):
+    """Writes airports.dat and routes.dat into out_dir and returns their paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    airports_file = os.path.join(out_dir, 'airports.dat')
+    routes_file = os.path.join(out_dir, 'routes.dat')
+    airports = write_airports(airports_file, num_airports, seed)
+    write_routes(routes_file, airports, num_routes, seed)
+    return airports_file, routes_file
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic OpenFlights-format flight network.")
+    parser.add_argument('--airports', type=int, default=1_000)
+    parser.add_argument('--routes', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out-dir', default='synthetic')
+    args = parser.parse_args()
+
+    print(f"✈️  Generating {args.airports:,} airports and {args.routes:,} routes...")
+    paths = generate_network(args.out_dir, args.airports, args.routes, args.seed)
+    print(f"✅ Wrote {paths[0]} and {paths[1]}.")
@@ -0,0 +1,14 @@
+import config
+from data_loader import build_flight_network
+from synthetic_data import generate_network
+
+
+def test_generated_routes_hit_budget_and_delay_prone_carriers(tmp_path, monkeypatch):
+    airports_file, routes_file = generate_network(str(tmp_path), 200, 2_000)
+    monkeypatch.setattr(config, 'AIRPORTS_FILE', airports_file)
+    monkeypatch.setattr(config, 'ROUTES_FILE', routes_file)
+    network = build_flight_network()
+
+    airlines = [weights['airline'] for edges in network.adjacency_list.values() for _, weights in edges]
+    assert any(airline in config.BUDGET_AIRLINES for airline in airlines)
+    assert any(airline in config.DELAY_PRONE_AIRLINES for airline in airlines)
@@ -1,38 +1,123 @@
-def bellman_ford(graph, start_node):
+from collections import deque
+from routing_engine import RoutingEngine, INF
+
+def _relax(graph, sources, queue):
     """
-    Finds the shortest paths from a start node using the Bellman-Ford algorithm.
+    Relaxes edges from the given sources (each at distance 0) until no
+    distance improves.
 
-    Args:
-        graph (dict): A graph where keys are nodes and values are dictionaries
-                      of {neighbor: weight}.
-        start_node (str): The starting node.
+    With queue=False it runs up to V-1 full passes and stops early after a
+    pass with no updates. With queue=True it only rescans the out-edges of
+    nodes whose distance just dropped (SPFA).
 
     Returns:
-        A tuple (distances, predecessors). Returns (None, None) if a
-        negative-weight cycle is detected.
+        A tuple (distances, predecessors, cycle), where cycle lists the
+        nodes of a negative-weight cycle (see _find_cycle), or None.
     """
     num_vertices = len(graph)
-    distances = {node: float('inf') for node in graph}
+    distances = {node: INF for node in graph}
     predecessors = {node: None for node in graph}
-    distances[start_node] = 0
+    for node in sources:
+        distances[node] = 0
+
+    if queue:
+        # A shortest path has at most V-1 edges, so a chain of V or more
+        # updates can only come from a negative-weight cycle.
+        hops = {node: 0 for node in sources}
+        pending = deque(sources)
+        in_queue = set(sources)
+        while pending:
+            u = pending.popleft()
+            in_queue.discard(u)
+            du = distances[u]
+            for v, weight in graph[u].items():
+                if du + weight < distances[v]:
+                    distances[v] = du + weight
+                    predecessors[v] = u
+                    hops[v] = hops[u] + 1
+                    if hops[v] >= num_vertices:
+                        cycle = _find_cycle(predecessors, v)
+                        if cycle:
+                            return distances, predecessors, cycle
+                    if v not in in_queue:
+                        in_queue.add(v)
+                        pending.append(v)
+        return distances, predecessors, None
 
-    # 1. Relax all edges V-1 times
+    # 1. Relax all edges up to V-1 times, stopping once a pass changes nothing
     for _ in range(num_vertices - 1):
+        updated = False
         for u in graph:
+            du = distances[u]
+            if du == INF:
+                continue
             for v, weight in graph[u].items():
-                if distances[u] != float('inf') and distances[u] + weight < distances[v]:
-                    distances[v] = distances[u] + weight
+                if du + weight < distances[v]:
+                    distances[v] = du + weight
                     predecessors[v] = u
+                    updated = True
+        if not updated:
+            return distances, predecessors, None
 
     # 2. Check for negative-weight cycles
     for u in graph:
+        du = distances[u]
+        if du == INF:
+            continue
         for v, weight in graph[u].items():
-            if distances[u] != float('inf') and distances[u] + weight < distances[v]:
-                print("Error: Graph contains a negative-weight cycle.")
-                return None, None
+            if du + weight < distances[v]:
+                predecessors[v] = u
+                return distances, predecessors, _find_cycle(predecessors, v)
+    return distances, predecessors, None
+
+def _find_cycle(predecessors, node):
+    """
+    Follows predecessors back from node and returns the cycle it runs into,
+    in travel order with the first node repeated at the end, or None.
+    """
+    seen = set()
+    while node is not None and node not in seen:
+        seen.add(node)
+        node = predecessors[node]
+    if node is None:
+        return None
+    cycle = [node]
+    current = predecessors[node]
+    while current != node:
+        cycle.append(current)
+        current = predecessors[current]
+    cycle.append(node)
+    return cycle[::-1]
+
+def bellman_ford(graph, start_node, queue=False):
+    """
+    Finds the shortest paths from a start node using the Bellman-Ford algorithm.
+
+    Args:
+        graph (dict): A graph where keys are nodes and values are dictionaries
+                      of {neighbor: weight}.
+        start_node (str): The starting node.
+        queue (bool): Use queue-based relaxation (SPFA), which only rescans
+                      nodes whose distance changed.
 
+    Returns:
+        A tuple (distances, predecessors). Returns (None, None) if a
+        negative-weight cycle is reachable from start_node; use
+        find_negative_cycle() to get the cycle itself.
+    """
+    distances, predecessors, cycle = _relax(graph, [start_node], queue)
+    if cycle is not None:
+        print(f"Error: Graph contains a negative-weight cycle: {' -> '.join(map(str, cycle))}")
+        return None, None
     return distances, predecessors
 
+def find_negative_cycle(graph, queue=True):
+    """
+    Returns the nodes of a negative-weight cycle anywhere in the graph, in
+    travel order with the first node repeated at the end, or None.
+    """
+    return _relax(graph, list(graph), queue)[2]
+
 def get_path(predecessors, start_node, end_node):
     """Constructs the path from the predecessors dictionary."""
     path = []
@@ -45,6 +130,53 @@ def get_path(predecessors, start_node, end_node):
         return path
     return None
 
+class Johnson:
+    """
+    Johnson's algorithm for graphs with negative (rebate) edges.
+
+    One Bellman-Ford run from a virtual source joined to every node gives
+    potentials h. Reweighting each edge to weight + h[u] - h[v] makes every
+    weight non-negative without changing which paths are shortest, so all
+    later queries run on a RoutingEngine at Dijkstra speed.
+    """
+    def __init__(self, graph):
+        distances, _, cycle = _relax(graph, list(graph), queue=True)
+        if cycle is not None:
+            raise ValueError(f"Graph contains a negative-weight cycle: {' -> '.join(map(str, cycle))}")
+        self.graph = graph
+        self.potentials = distances
+        # Rounding can leave a reweighted edge a hair below zero; clamp it.
+        self.engine = RoutingEngine({
+            u: {v: {'weight': max(0, weight + distances[u] - distances[v])} for v, weight in neighbors.items()}
+            for u, neighbors in graph.items()
+        })
+
+    def _value(self, path):
+        """Sums the original weights along path, so values are exact."""
+        return sum(self.graph[u][v] for u, v in zip(path, path[1:]))
+
+    def query(self, start, end):
+        """
+        Returns:
+            A tuple (value, path) in original weights, or (None, None) if
+            end is unreachable.
+        """
+        _, path = self.engine.dijkstra(start, end, 'weight')
+        if path is None:
+            return None, None
+        return self._value(path), path
+
+    def single_source(self, start):
+        """Returns {node: distance} in original weights from start (INF if unreachable)."""
+        dist, _ = self.engine.single_source(start, 'weight')
+        h_start = self.potentials[start]
+        return {node: dist[i] - h_start + self.potentials[node] if dist[i] < INF else INF
+                for i, node in enumerate(self.engine.nodes)}
+
+    def all_pairs(self):
+        """Returns {start: {node: distance}} for every pair of nodes, one Dijkstra per start."""
+        return {start: self.single_source(start) for start in self.graph}
+
 # --- Example Usage ---
 if __name__ == "__main__":
     # Graph with a penalty/rebate (negative weight)
@@ -69,3 +201,13 @@ if __name__ == "__main__":
             print(f"Path: {' -> '.join(path)}")
         else:
             print(f"No path found from {start_city} to {end_city}.")
+
+    distances, predecessors = bellman_ford(travel_graph_negative, start_city, queue=True)
+    print(f"SPFA cost from {start_city} to {end_city}: ${distances[end_city]}")
+
+    johnson = Johnson(travel_graph_negative)
+    value, path = johnson.query(start_city, end_city)
+    print(f"Johnson cost from {start_city} to {end_city}: ${value} via {' -> '.join(path)}")
+
+    travel_graph_negative['London']['Dubai'] = -800 # Rebate large enough to create a cycle
+    print(f"Negative cycle: {find_negative_cycle(travel_graph_negative)}")
@@ -64,18 +64,19 @@ def dijkstra(start, end, param):
     return None, None
 
 # --- Main Program ---
-start_node = input("Enter the starting airport: ")
-end_node = input("Enter the destination airport: ")
-param = input("Enter the parameter to optimize (cost/time): ")
+if __name__ == "__main__":
+    start_node = input("Enter the starting airport: ")
+    end_node = input("Enter the destination airport: ")
+    param = input("Enter the parameter to optimize (cost/time): ")
 
-if start_node in adj and end_node in adj and param in ['cost', 'time']:
-    value, path = dijkstra(start_node, end_node, param) 
+    if start_node in adj and end_node in adj and param in ['cost', 'time']:
+        value, path = dijkstra(start_node, end_node, param) 
     
-    print("\n--- Results ---")
-    if value is not None and path is not None:
-        print(f"The minimum {param} from {start_node} to {end_node} is: {value}")
-        print(f"Path: {' -> '.join(path)}")
+        print("\n--- Results ---")
+        if value is not None and path is not None:
+            print(f"The minimum {param} from {start_node} to {end_node} is: {value}")
+            print(f"Path: {' -> '.join(path)}")
+        else:
+            print(f"No path found from {start_node} to {end_node}.")
     else:
-        print(f"No path found from {start_node} to {end_node}.")
-else:
-    print("Invalid input. Please check airport names and parameter (cost/time).")
\ No newline at end of file
+        print("Invalid input. Please check airport names and parameter (cost/time).")
\ No newline at end of file
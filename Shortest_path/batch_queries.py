@@ -0,0 +1,109 @@
+import heapq
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from routing_engine import INF
+
+# The worker's copy of the RoutingEngine. Its CSR arrays are the bulk of a
+# task's data and identical for every batch, so the pool initializer hands
+# them over when the worker starts and each task carries only its origins.
+_worker_engine = None
+
+def one_to_many(engine, source, target_ids, metric):
+    """
+    Runs one Dijkstra from source and reads off every target, stopping once
+    all of them are settled.
+
+    Args:
+        target_ids: Node ids (not names) to read off, e.g. [engine.index[n] for n in names].
+
+    Returns:
+        An array('d') of values in target_ids order; INF where unreachable.
+    """
+    offsets, targets_of, column = engine.offsets, engine.targets, engine.weights[metric]
+    source_id = engine.index[source]
+    remaining = set(target_ids)
+    dist = {source_id: 0}
+    heap = [(0, source_id)]
+    while heap and remaining:
+        curr_value, u = heapq.heappop(heap)
+        if curr_value > dist[u]:
+            continue
+        remaining.discard(u)
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets_of[e]
+            new_value = curr_value + column[e]
+            if new_value < dist.get(v, INF):
+                dist[v] = new_value
+                heapq.heappush(heap, (new_value, v))
+    return array('d', [dist.get(t, INF) for t in target_ids])
+
+def _init_worker(engine):
+    global _worker_engine
+    _worker_engine = engine
+
+def _rows_worker(task):
+    """Worker: computes the matrix rows for a batch of origins as one flat array('d')."""
+    origins, target_ids, metric = task
+    rows = array('d')
+    for origin in origins:
+        rows.extend(one_to_many(_worker_engine, origin, target_ids, metric))
+    return rows
+
+def iter_matrix_rows(engine, origins, targets, metric, workers=None, batch_size=16):
+    """
+    Yields (origin, row) for each origin in order, where row is an
+    array('d') of `metric` values to each of targets (INF if unreachable).
+
+    Origins are fanned out across a process pool in batches of batch_size;
+    each worker receives the engine once and runs one single-source search
+    per origin. With workers=1 everything runs in this process.
+    """
+    engine._check_metric(metric)
+    origins = list(origins)
+    target_ids = [engine.index[target] for target in targets]
+    width = len(target_ids)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for origin in origins:
+            yield origin, one_to_many(engine, origin, target_ids, metric)
+        return
+
+    batches = [origins[i:i + batch_size] for i in range(0, len(origins), batch_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(engine,)) as pool:
+        for batch, rows in zip(batches, pool.map(_rows_worker, [(batch, target_ids, metric) for batch in batches])):
+            for i, origin in enumerate(batch):
+                yield origin, rows[i * width:(i + 1) * width]
+
+def many_to_many(engine, origins, targets, metric, workers=None):
+    """
+    Returns the len(origins) x len(targets) value matrix as one flat,
+    row-major array('d'); entry [i * len(targets) + j] is origin i to target j.
+    """
+    matrix = array('d')
+    for _, row in iter_matrix_rows(engine, origins, targets, metric, workers):
+        matrix.extend(row)
+    return matrix
+
+def write_matrix(path, engine, origins, targets, metric, workers=None):
+    """
+    Streams the many_to_many matrix to path as raw row-major float64 values,
+    one row at a time, so the full matrix never has to sit in memory.
+    It can be read back with numpy.fromfile(path).reshape(len(origins), -1).
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        for _, row in iter_matrix_rows(engine, origins, targets, metric, workers):
+            f.write(row.tobytes())
+    os.replace(tmp_path, path)
+
+
+# --- Example Usage ---
+if __name__ == "__main__":
+    from Dijkstras import adj
+    from routing_engine import RoutingEngine
+
+    engine = RoutingEngine(adj)
+    cities = list(adj)
+    for origin, row in iter_matrix_rows(engine, cities, cities, 'cost', workers=2):
+        print(f"{origin:>14}: {' '.join(f'{value:>6.0f}' for value in row)}")
@@ -0,0 +1,101 @@
+# hop_limited.py
+
+import numpy as np
+from routing_engine import INF
+
+class HopLimitedSearch:
+    """
+    Hop-constrained cheapest routes over a RoutingEngine's network.
+
+    Round h of Bellman-Ford relaxation, run from the best values with at
+    most h - 1 flights, gives the best values with at most h flights. Each
+    round is done over the whole CSR edge array at once with NumPy: edges
+    are pre-sorted by destination so np.minimum.reduceat takes the best
+    incoming value of every airport in one call.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        offsets = np.asarray(engine.offsets, dtype=np.int64)
+        targets = np.asarray(engine.targets, dtype=np.int64)
+        sources = np.repeat(np.arange(len(engine.nodes), dtype=np.int64), np.diff(offsets))
+        self._order = np.argsort(targets, kind='stable')
+        self._sources = sources[self._order]
+        sorted_targets = targets[self._order]
+        # First position of each destination's run of incoming edges
+        self._starts = np.flatnonzero(np.r_[True, sorted_targets[1:] != sorted_targets[:-1]]) if len(targets) else np.empty(0, dtype=np.int64)
+        self._heads = sorted_targets[self._starts]
+        self._columns = {} # metric -> weights in destination-sorted edge order
+
+    def _column(self, metric):
+        self.engine._check_metric(metric)
+        if metric not in self._columns:
+            self._columns[metric] = np.asarray(self.engine.weights[metric], dtype=np.float64)[self._order]
+        return self._columns[metric]
+
+    def table(self, start, max_hops, metric='cost'):
+        """
+        Returns a (max_hops + 1) x V array whose row h holds the best
+        `metric` value from start to every airport using at most h flights
+        (inf where unreachable), indexed by engine node id.
+        """
+        column = self._column(metric)
+        table = np.full((max_hops + 1, len(self.engine.nodes)), INF)
+        table[0, self.engine.index[start]] = 0
+        for h in range(1, max_hops + 1):
+            previous, current = table[h - 1], table[h]
+            current[:] = previous
+            if len(self._starts):
+                best_in = np.minimum.reduceat(previous[self._sources] + column, self._starts)
+                current[self._heads] = np.minimum(current[self._heads], best_in)
+        return table
+
+    def path(self, table, start, end, hops, metric='cost'):
+        """
+        Rebuilds the route behind table[hops][end] by finding, flight by
+        flight from end, an edge that accounts for the value exactly.
+        Returns None if end is unreachable within hops flights.
+        """
+        engine = self.engine
+        column = engine.weights[metric]
+        start_id, node = engine.index[start], engine.index[end]
+        if table[hops, node] == INF:
+            return None
+        reverse_offsets, reverse_sources, reverse_edges = engine.reverse_adjacency()
+        path = [node]
+        while node != start_id or table[hops, node] != 0:
+            while hops > 0 and table[hops - 1, node] == table[hops, node]:
+                hops -= 1
+            for r in range(reverse_offsets[node], reverse_offsets[node + 1]):
+                u = reverse_sources[r]
+                if table[hops - 1, u] + column[reverse_edges[r]] == table[hops, node]:
+                    node, hops = u, hops - 1
+                    break
+            path.append(node)
+        return [engine.nodes[i] for i in reversed(path)]
+
+    def cheapest(self, start, end, max_stops, metric='cost'):
+        """
+        Finds the minimum-`metric` route from start to end with at most
+        max_stops layovers (max_stops + 1 flights).
+
+        Returns:
+            A tuple (value, path), or (None, None) if no such route exists.
+        """
+        if start not in self.engine.index or end not in self.engine.index:
+            return None, None
+        table = self.table(start, max_stops + 1, metric)
+        value = table[-1, self.engine.index[end]]
+        if value == INF:
+            return None, None
+        return float(value), self.path(table, start, end, max_stops + 1, metric)
+
+
+# --- Example Usage ---
+if __name__ == "__main__":
+    from Dijkstras import adj
+    from routing_engine import RoutingEngine
+
+    search = HopLimitedSearch(RoutingEngine(adj))
+    for max_stops in range(3):
+        value, path = search.cheapest('Chennai', 'San Francisco', max_stops)
+        print(f"Max {max_stops} stops: {value} via {' -> '.join(path) if path else '-'}")
@@ -0,0 +1,108 @@
+import heapq
+from routing_engine import INF
+
+def _prefix_values(engine, column, path):
+    """Running totals along a node-id path, taking the cheapest of any parallel edges."""
+    values = [0]
+    for u, v in zip(path, path[1:]):
+        weight = min(column[e] for e in range(engine.offsets[u], engine.offsets[u + 1]) if engine.targets[e] == v)
+        values.append(values[-1] + weight)
+    return values
+
+def _spur_path(engine, column, spur, end_id, blocked_nodes, blocked_hops, to_end, next_hop):
+    """
+    Shortest spur -> end path that avoids blocked_nodes and does not leave
+    spur towards any of blocked_hops, or None.
+
+    to_end holds exact distances to end in the unrestricted network. If the
+    shortest-path tree's own route from spur is not blocked it is returned
+    directly; otherwise to_end is an exact-when-unblocked, never-overestimating
+    A* heuristic, so the search stays close to the tree.
+    """
+    path = [spur]
+    while path[-1] != end_id and path[-1] != -1:
+        path.append(next_hop[path[-1]])
+    if path[-1] == end_id and (len(path) < 2 or path[1] not in blocked_hops) and blocked_nodes.isdisjoint(path):
+        return path
+
+    offsets, targets = engine.offsets, engine.targets
+    dist, pred = {spur: 0}, {spur: -1}
+    heap = [(to_end[spur], spur)]
+    while heap:
+        priority, u = heapq.heappop(heap)
+        curr_value = dist[u]
+        if priority > curr_value + to_end[u]:
+            continue
+        if u == end_id:
+            path = []
+            while u != -1:
+                path.append(u)
+                u = pred[u]
+            return path[::-1]
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            if v in blocked_nodes or to_end[v] == INF or (u == spur and v in blocked_hops):
+                continue
+            new_value = curr_value + column[e]
+            if new_value < dist.get(v, INF):
+                dist[v] = new_value
+                pred[v] = u
+                heapq.heappush(heap, (new_value + to_end[v], v))
+    return None
+
+def k_shortest_paths(engine, start, end, metric, k=10):
+    """
+    Yen's algorithm for the k shortest loopless start -> end paths by `metric`.
+
+    A path's spur searches only start at or after the node where it left
+    the path it was derived from (Lawler's refinement): earlier roots are
+    shared with that parent and were already searched with the same
+    exclusions. The next hops already used after each root path are cached
+    by prefix, and one reverse shortest-path tree to end serves every spur
+    search as both a ready-made answer and an A* heuristic.
+
+    Returns:
+        A list of up to k (value, path) tuples in increasing value.
+    """
+    start_id, end_id = engine._check(start, end, metric)
+    if start_id is None or end_id is None:
+        return []
+
+    column = engine.weights[metric]
+    to_end, next_hop = engine.single_source(end, metric, reverse=True)
+    if to_end[start_id] == INF:
+        return []
+
+    first = _spur_path(engine, column, start_id, end_id, set(), set(), to_end, next_hop)
+    accepted = [] # (value, path ids, deviation index)
+    used_hops = {} # root path tuple -> next hops taken after it by accepted paths
+    candidates = [(_prefix_values(engine, column, first)[-1], tuple(first), 0)]
+    seen = {tuple(first)}
+
+    while candidates and len(accepted) < k:
+        value, path, deviation = heapq.heappop(candidates)
+        accepted.append((value, path, deviation))
+        for i in range(len(path) - 1):
+            used_hops.setdefault(path[:i + 1], set()).add(path[i + 1])
+
+        for i in range(deviation, len(path) - 1):
+            root = path[:i + 1]
+            spur = _spur_path(engine, column, path[i], end_id, set(root[:-1]), used_hops[root], to_end, next_hop)
+            if spur is None:
+                continue
+            candidate = root[:-1] + tuple(spur)
+            if candidate not in seen:
+                seen.add(candidate)
+                heapq.heappush(candidates, (_prefix_values(engine, column, candidate)[-1], candidate, i))
+
+    return [(value, [engine.nodes[node] for node in path]) for value, path, _ in accepted]
+
+
+# --- Example Usage ---
+if __name__ == "__main__":
+    from Dijkstras import adj
+    from routing_engine import RoutingEngine
+
+    engine = RoutingEngine(adj)
+    for value, path in k_shortest_paths(engine, 'Chennai', 'San Francisco', 'cost', k=5):
+        print(f"{value}: {' -> '.join(path)}")
@@ -0,0 +1,156 @@
+import json
+import os
+import struct
+import numpy as np
+from routing_engine import INF
+
+MAGIC = b'GALMK002'
+_PREFIX = struct.Struct('<8sQ')
+
+class LandmarkIndex:
+    """
+    ALT (A*, Landmarks, Triangle inequality) preprocessing for a RoutingEngine.
+
+    For each metric it picks its own k landmarks and stores the forward
+    distances d(L, v) and backward distances d(v, L) to every node as
+    (k x V) arrays. By the triangle inequality,
+    d(v, t) >= max(d(L, t) - d(L, v), d(v, L) - d(t, L)) for every L, which
+    is a consistent A* heuristic for any metric, including cost and delay.
+
+    Space Complexity: O(k * metrics * V).
+    """
+    def __init__(self, landmarks, forward, backward, fingerprint, k):
+        self.landmarks = landmarks # metric -> node ids of that metric's landmarks
+        self.forward = forward # metric -> (k x V) array of d(L, v)
+        self.backward = backward # metric -> (k x V) array of d(v, L)
+        self.fingerprint = fingerprint
+        self.k = k # Landmarks asked for per metric; fewer are kept if the rest are unreachable
+
+    @classmethod
+    def build(cls, engine, k=16, metrics=None):
+        """
+        Chooses k landmarks per metric and precomputes their distance arrays.
+
+        The first landmark is the airport with the most departures (a major
+        hub). Each next one is the airport farthest, by that metric, from
+        every landmark chosen so far (farthest-point selection), which spreads
+        the landmarks around the edge of the network where their bounds are
+        tightest. Selecting per metric matters because the airports that are
+        far apart in cost or delay are not the ones far apart in distance.
+
+        Time Complexity: O(k * metrics * (E + V log V)).
+        """
+        metrics = list(metrics or engine.weights)
+        num_nodes = len(engine.nodes)
+        k = min(k, num_nodes)
+        out_degree = [engine.offsets[i + 1] - engine.offsets[i] for i in range(num_nodes)]
+        hub = max(range(num_nodes), key=out_degree.__getitem__)
+
+        landmarks, forward, backward = {}, {}, {}
+        for metric in metrics:
+            chosen, rows_f, rows_b = [hub], [], []
+            closest = np.full(num_nodes, INF) # Distance from the nearest chosen landmark
+            while True:
+                node = engine.nodes[chosen[-1]]
+                rows_f.append(engine.single_source(node, metric)[0])
+                rows_b.append(engine.single_source(node, metric, reverse=True)[0])
+                if len(chosen) == k:
+                    break
+                np.minimum(closest, rows_f[-1], out=closest)
+                # Only airports the landmarks reach are candidates, and never one already chosen.
+                candidates = np.where(np.isfinite(closest), closest, -INF)
+                candidates[chosen] = -INF
+                farthest = int(np.argmax(candidates))
+                if candidates[farthest] == -INF:
+                    break
+                chosen.append(farthest)
+            landmarks[metric] = chosen
+            forward[metric] = np.array(rows_f, dtype=np.float64)
+            backward[metric] = np.array(rows_b, dtype=np.float64)
+        return cls(landmarks, forward, backward, engine.fingerprint(), k)
+
+    def bound_function(self, metric, target_id):
+        """
+        Returns h(v), a lower bound on the `metric` distance from v to
+        target_id, or None if this metric was not preprocessed. h(v) is INF
+        when the landmarks prove target_id cannot be reached from v.
+
+        The bounds of every node are computed up front in one NumPy pass
+        over the landmark arrays, so h(v) is a single list lookup.
+        """
+        if metric not in self.forward:
+            return None
+        forward, backward = self.forward[metric], self.backward[metric]
+        from_l_to_t = forward[:, target_id, None] # d(L, t)
+        t_to_l = backward[:, target_id, None] # d(t, L)
+
+        # IEEE infinities carry the reachability logic: d(L, t) finite with
+        # d(L, v) = inf gives -inf (no information); d(L, t) = inf with d(L, v)
+        # finite gives inf (v cannot reach t). inf - inf is NaN, which fmax
+        # ignores. The backward term is symmetric.
+        with np.errstate(invalid='ignore'):
+            bounds = np.fmax(np.fmax.reduce(from_l_to_t - forward, axis=0), np.fmax.reduce(backward - t_to_l, axis=0))
+        return np.fmax(bounds, 0.0).tolist().__getitem__
+
+    def save(self, path):
+        """Writes the landmark arrays to a binary file next to the graph."""
+        metrics = list(self.forward)
+        header = json.dumps({'fingerprint': self.fingerprint, 'k': self.k, 'landmarks': self.landmarks, 'metrics': metrics,
+                             'num_nodes': self.forward[metrics[0]].shape[1] if metrics else 0}).encode('utf-8')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_PREFIX.pack(MAGIC, len(header)))
+            f.write(header)
+            for metric in metrics:
+                f.write(np.ascontiguousarray(self.forward[metric]).tobytes())
+                f.write(np.ascontiguousarray(self.backward[metric]).tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, engine=None):
+        """
+        Reads a saved index. Returns None if the file is missing or
+        unreadable, or if an engine is given and its network no longer
+        matches the saved one.
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            magic, header_len = _PREFIX.unpack_from(data, 0)
+            if magic != MAGIC:
+                return None
+            header = json.loads(data[_PREFIX.size:_PREFIX.size + header_len])
+            if engine is not None and header['fingerprint'] != engine.fingerprint():
+                return None
+
+            num_nodes = header['num_nodes']
+            pos = _PREFIX.size + header_len
+            forward, backward = {}, {}
+            for metric in header['metrics']:
+                k = len(header['landmarks'][metric])
+                for arrays in (forward, backward):
+                    arrays[metric] = np.frombuffer(data, dtype=np.float64, count=k * num_nodes, offset=pos).reshape(k, num_nodes)
+                    pos += 8 * k * num_nodes
+        except (struct.error, ValueError, KeyError, TypeError):
+            return None
+        return cls(header['landmarks'], forward, backward, header['fingerprint'], header['k'])
+
+    @classmethod
+    def load_or_build(cls, engine, path, k=16, metrics=None):
+        """
+        Loads the saved index for this network, rebuilding and saving it if
+        it is stale or was built with a different k or set of metrics.
+        """
+        metrics = list(metrics or engine.weights)
+        index = cls.load(path, engine)
+        if index is not None and (index.k != min(k, len(engine.nodes)) or sorted(index.landmarks) != sorted(metrics)):
+            index = None
+        if index is None:
+            print(f"... Building {k} landmarks per metric ...")
+            index = cls.build(engine, k, metrics)
+            index.save(path)
+            print("✅ Landmarks saved.")
+        return index
@@ -0,0 +1,123 @@
+import heapq
+import itertools
+from routing_engine import INF
+
+DEFAULT_METRICS = ('cost', 'distance', 'delay')
+
+# Most non-dominated labels kept at any one airport. Once an airport is full,
+# further labels there are dropped, so the frontier may miss some trade-offs
+# but the search stays bounded on hub-heavy networks.
+MAX_LABELS_PER_NODE = 64
+
+def _dominates(a, b, slack):
+    """True if vector a is at least as good as b in every criterion, within a (1 + epsilon) slack."""
+    for x, y in zip(a, b):
+        if x > y * slack:
+            return False
+    return True
+
+def _is_dominated(vector, labels, slack):
+    for other in labels:
+        if _dominates(other, vector, slack):
+            return True
+    return False
+
+def pareto_routes(engine, start, end, metrics=None, epsilon=0.0, max_labels=MAX_LABELS_PER_NODE):
+    """
+    Multi-criteria label-setting search (Martins' algorithm) over a
+    RoutingEngine's network.
+
+    Each label is a vector of path totals, one per metric. Labels are
+    expanded in lexicographic order, so a label that is not dominated by one
+    already settled at its airport is Pareto-optimal there. A new label is
+    checked when it is pushed, against the labels settled and still queued
+    at its airport and the routes already found to end; it is dropped if
+    any dominates it, and queued labels it dominates are dropped instead.
+
+    With epsilon > 0, a label is also pruned when another is within a factor
+    (1 + epsilon) of it in every criterion. The result is then an
+    epsilon-approximate frontier: every optimal trade-off is matched to
+    within that factor, with far fewer labels. max_labels caps the labels
+    settled and queued at each airport together (None for no cap).
+
+    Returns:
+        A list of (values, path) tuples, values being a {metric: total}
+        dict, sorted by the first metric. Empty if end is unreachable.
+    """
+    metrics = list(metrics or [m for m in DEFAULT_METRICS if m in engine.weights])
+    for metric in metrics:
+        engine._check_metric(metric)
+    start_id, end_id = engine.index.get(start), engine.index.get(end)
+    if start_id is None or end_id is None:
+        return []
+
+    slack = 1.0 + epsilon
+    offsets, targets = engine.offsets, engine.targets
+    columns = [engine.weights[metric] for metric in metrics]
+    settled = {} # node id -> vectors of the labels settled there
+    pending = {} # node id -> {push number: vector} of the labels still queued there
+    parents = [] # label id -> (node id, parent label id)
+    found = [] # (vector, label id) of the labels settled at end
+    found_vectors = []
+    pushes = itertools.count(1)
+    heap = [(tuple(0 for _ in metrics), start_id, -1, 0)]
+    pending[start_id] = {0: heap[0][0]}
+    num_settled = 0
+
+    while heap:
+        vector, u, parent, push = heapq.heappop(heap)
+        queued = pending[u]
+        if push not in queued:
+            continue # Dropped after a dominating label reached u
+        del queued[push]
+        here = settled.setdefault(u, [])
+        # Routes to end found since this label was queued may dominate it now.
+        if u != end_id and _is_dominated(vector, found_vectors, slack):
+            continue
+        here.append(vector)
+        label_id = len(parents)
+        parents.append((u, parent))
+        num_settled += 1
+        if u == end_id:
+            found.append((vector, label_id))
+            found_vectors.append(vector)
+            continue # Extending past end only produces dominated routes
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            new_vector = tuple(total + column[e] for total, column in zip(vector, columns))
+            if INF in new_vector:
+                continue
+            if v != end_id and _is_dominated(new_vector, found_vectors, slack):
+                continue
+            at_v, queued = settled.get(v, ()), pending.setdefault(v, {})
+            if _is_dominated(new_vector, at_v, slack) or _is_dominated(new_vector, queued.values(), slack):
+                continue
+            # Queued labels the new one beats outright can never be needed.
+            # Only exact dominance drops them, so epsilon slack never compounds.
+            for stale in [p for p, other in queued.items() if _dominates(new_vector, other, 1.0)]:
+                del queued[stale]
+            if max_labels is not None and len(at_v) + len(queued) >= max_labels:
+                continue
+            push = next(pushes)
+            queued[push] = new_vector
+            heapq.heappush(heap, (new_vector, v, label_id, push))
+
+    engine.last_settled = num_settled
+    routes = []
+    for vector, label_id in found:
+        path = []
+        while label_id != -1:
+            node, label_id = parents[label_id]
+            path.append(engine.nodes[node])
+        routes.append((dict(zip(metrics, vector)), path[::-1]))
+    return routes
+
+
+# --- Example Usage ---
+if __name__ == "__main__":
+    from Dijkstras import adj
+    from routing_engine import RoutingEngine
+
+    engine = RoutingEngine(adj)
+    for values, path in pareto_routes(engine, 'Chennai', 'San Francisco', metrics=('cost', 'time')):
+        print(f"cost {values['cost']}, time {values['time']}: {' -> '.join(path)}")
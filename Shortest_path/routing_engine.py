@@ -0,0 +1,439 @@
+import hashlib
+import heapq
+import random
+import time
+from array import array
+from math import radians, sin, cos, asin, sqrt
+
+INF = float('inf')
+EARTH_RADIUS_KM = 6371.0
+
+# A great-circle bound weaker than this share of the median edge's weight per
+# km saves too few settled nodes to pay for evaluating it, so A* runs as plain
+# Dijkstra instead (e.g. delay, whose bound is ~10% of the median).
+MIN_HEURISTIC_SHARE = 0.25
+
+class RoutingEngine:
+    """
+    Dijkstra query engine bound once to a flight network.
+
+    The network can be a Graph from data_loader (anything with an
+    adjacency_list of (dest, weights) tuples), a CSRGraph (anything with
+    offsets/targets/weights arrays), or a plain {node: {neighbor: weights}}
+    dict like the `adj` in Dijkstras.py. It is copied once into flat
+    integer-indexed lists, and the distance/predecessor buffers are
+    allocated once and reset lazily, so a query only pays for the nodes it
+    touches.
+    """
+    def __init__(self, network):
+        if hasattr(network, 'offsets'):
+            self._bind_csr(network)
+        elif hasattr(network, 'adjacency_list'):
+            self._bind_adjacency({src: edges for src, edges in network.adjacency_list.items()},
+                                 getattr(network, 'airports', {}))
+        else:
+            self._bind_adjacency({src: list(neighbors.items()) for src, neighbors in network.items()}, {})
+
+        num_nodes = len(self.nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self._dist = [INF] * num_nodes
+        self._pred = [-1] * num_nodes
+        self._touched = []
+        # Backward-search buffers and reverse adjacency, created on first bidirectional query.
+        self._dist_b = self._succ_b = None
+        self._touched_b = []
+        self._reverse = None
+        self._edge_km = None # Great-circle length of every edge, for A* bounds
+        self._ratios = {} # Cached A* heuristic ratio per metric
+        self.last_settled = 0 # Nodes settled by the most recent query
+
+    def _bind_csr(self, csr_graph):
+        self.nodes = [airport.iata for airport in csr_graph.airports]
+        self.offsets = list(csr_graph.offsets)
+        self.targets = list(csr_graph.targets)
+        self.weights = {metric: list(column) for metric, column in csr_graph.weights.items()}
+        self.lat, self.lon = list(csr_graph.lat), list(csr_graph.lon)
+
+    def _bind_adjacency(self, adjacency, airports):
+        # Every node that appears only as a destination still needs an id.
+        self.nodes = list(adjacency)
+        seen = set(self.nodes)
+        for edges in adjacency.values():
+            for dest, _ in edges:
+                if dest not in seen:
+                    seen.add(dest)
+                    self.nodes.append(dest)
+        index = {node: i for i, node in enumerate(self.nodes)}
+
+        metrics = set()
+        for edges in adjacency.values():
+            for _, w in edges:
+                metrics.update(key for key, value in w.items() if isinstance(value, (int, float)))
+        self.offsets, self.targets = [0], []
+        self.weights = {metric: [] for metric in metrics}
+        for node in self.nodes:
+            for dest, w in adjacency.get(node, []):
+                self.targets.append(index[dest])
+                for metric in metrics:
+                    self.weights[metric].append(w.get(metric, INF))
+            self.offsets.append(len(self.targets))
+
+        if airports and all(node in airports for node in self.nodes):
+            self.lat = [airports[node].lat for node in self.nodes]
+            self.lon = [airports[node].lon for node in self.nodes]
+        else:
+            self.lat = self.lon = None
+
+    def _reset(self):
+        """Clears only the buffer entries the previous query wrote."""
+        dist, pred = self._dist, self._pred
+        for i in self._touched:
+            dist[i] = INF
+            pred[i] = -1
+        self._touched = []
+        if self._dist_b is not None:
+            dist_b, succ_b = self._dist_b, self._succ_b
+            for i in self._touched_b:
+                dist_b[i] = INF
+                succ_b[i] = -1
+        self._touched_b = []
+
+    def reverse_adjacency(self):
+        """
+        Builds (once) the reverse CSR: for node v, entries
+        rev_offsets[v] .. rev_offsets[v+1]-1 give (rev_sources, rev_edges),
+        the source id and forward edge id of every edge into v.
+        """
+        if self._reverse is None:
+            num_nodes = len(self.nodes)
+            rev_offsets = [0] * (num_nodes + 1)
+            for v in self.targets:
+                rev_offsets[v + 1] += 1
+            for i in range(num_nodes):
+                rev_offsets[i + 1] += rev_offsets[i]
+            cursor = rev_offsets[:-1]
+            rev_sources = [0] * len(self.targets)
+            rev_edges = [0] * len(self.targets)
+            for u in range(num_nodes):
+                for e in range(self.offsets[u], self.offsets[u + 1]):
+                    v = self.targets[e]
+                    rev_sources[cursor[v]] = u
+                    rev_edges[cursor[v]] = e
+                    cursor[v] += 1
+            self._reverse = (rev_offsets, rev_sources, rev_edges)
+            self._dist_b = [INF] * num_nodes
+            self._succ_b = [-1] * num_nodes
+        return self._reverse
+
+    def _path(self, pred, start_id, end_id):
+        """Follows predecessor ids back from end_id and returns node names."""
+        path = []
+        current = end_id
+        while current != -1:
+            path.append(self.nodes[current])
+            if current == start_id:
+                return path[::-1]
+            current = pred[current]
+        return None
+
+    def _check_metric(self, metric):
+        if metric not in self.weights:
+            raise ValueError(f"Unknown metric '{metric}'. Choose from: {sorted(self.weights)}")
+
+    def _check(self, start, end, metric):
+        self._check_metric(metric)
+        return self.index.get(start), self.index.get(end)
+
+    def dijkstra(self, start, end, metric):
+        """
+        Finds the minimum-`metric` path from start to end, stopping as soon
+        as end is settled.
+
+        Returns:
+            A tuple (value, path), or (None, None) if end is unreachable.
+        """
+        start_id, end_id = self._check(start, end, metric)
+        if start_id is None or end_id is None:
+            return None, None
+
+        self._reset()
+        dist, pred, touched = self._dist, self._pred, self._touched
+        offsets, targets, column = self.offsets, self.targets, self.weights[metric]
+        dist[start_id] = 0
+        touched.append(start_id)
+        heap = [(0, start_id)]
+        settled = 0
+
+        while heap:
+            curr_value, u = heapq.heappop(heap)
+            if curr_value > dist[u]:
+                continue
+            settled += 1
+            if u == end_id:
+                self.last_settled = settled
+                return curr_value, self._path(pred, start_id, end_id)
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                new_value = curr_value + column[e]
+                if new_value < dist[v]:
+                    if dist[v] == INF:
+                        touched.append(v)
+                    dist[v] = new_value
+                    pred[v] = u
+                    heapq.heappush(heap, (new_value, v))
+
+        self.last_settled = settled
+        return None, None
+
+    def bidirectional_dijkstra(self, start, end, metric):
+        """
+        Point-to-point Dijkstra that searches forward from start and backward
+        from end on the reverse adjacency, always expanding the side with the
+        smaller queue head.
+
+        It keeps mu, the best start->end length seen where the two searches
+        meet, and stops once top_forward + top_backward >= mu: no unsettled
+        path can beat mu after that. Returns the same value as dijkstra();
+        the path is the same unless several optimal paths tie.
+
+        Returns:
+            A tuple (value, path), or (None, None) if end is unreachable.
+        """
+        start_id, end_id = self._check(start, end, metric)
+        if start_id is None or end_id is None:
+            return None, None
+
+        rev_offsets, rev_sources, rev_edges = self.reverse_adjacency()
+        self._reset()
+        dist_f, pred_f, touched_f = self._dist, self._pred, self._touched
+        dist_b, succ_b, touched_b = self._dist_b, self._succ_b, self._touched_b
+        offsets, targets, column = self.offsets, self.targets, self.weights[metric]
+
+        dist_f[start_id] = 0
+        dist_b[end_id] = 0
+        touched_f.append(start_id)
+        touched_b.append(end_id)
+        heap_f, heap_b = [(0, start_id)], [(0, end_id)]
+        best, meet = (0, start_id) if start_id == end_id else (INF, -1)
+        settled = 0
+
+        while heap_f and heap_b and heap_f[0][0] + heap_b[0][0] < best:
+            if heap_f[0][0] <= heap_b[0][0]:
+                curr_value, u = heapq.heappop(heap_f)
+                if curr_value > dist_f[u]:
+                    continue
+                settled += 1
+                for e in range(offsets[u], offsets[u + 1]):
+                    v = targets[e]
+                    new_value = curr_value + column[e]
+                    if new_value < dist_f[v]:
+                        if dist_f[v] == INF:
+                            touched_f.append(v)
+                        dist_f[v] = new_value
+                        pred_f[v] = u
+                        heapq.heappush(heap_f, (new_value, v))
+                        if new_value + dist_b[v] < best:
+                            best, meet = new_value + dist_b[v], v
+            else:
+                curr_value, v = heapq.heappop(heap_b)
+                if curr_value > dist_b[v]:
+                    continue
+                settled += 1
+                for r in range(rev_offsets[v], rev_offsets[v + 1]):
+                    u = rev_sources[r]
+                    new_value = curr_value + column[rev_edges[r]]
+                    if new_value < dist_b[u]:
+                        if dist_b[u] == INF:
+                            touched_b.append(u)
+                        dist_b[u] = new_value
+                        succ_b[u] = v
+                        heapq.heappush(heap_b, (new_value, u))
+                        if new_value + dist_f[u] < best:
+                            best, meet = new_value + dist_f[u], u
+
+        self.last_settled = settled
+        if meet == -1:
+            return None, None
+        path = self._path(pred_f, start_id, meet)
+        current = succ_b[meet]
+        while current != -1:
+            path.append(self.nodes[current])
+            current = succ_b[current]
+        return best, path
+
+    def _great_circle_km(self, i, j):
+        lat1, lat2 = self._lat_rad[i], self._lat_rad[j]
+        a = sin((lat2 - lat1) / 2)**2 + self._cos_lat[i] * self._cos_lat[j] * sin((self._lon_rad[j] - self._lon_rad[i]) / 2)**2
+        return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+    def heuristic_ratio(self, metric):
+        """
+        Returns the largest r such that r * great-circle km never exceeds an
+        edge's `metric` weight: the minimum over all edges of weight / km.
+
+        r * haversine(node, end) is then a consistent A* heuristic for that
+        metric (for distance, r is just under 1 because edge distances are
+        rounded). Returns 0, so astar() runs plain Dijkstra, when there are
+        no coordinates, no positive bound, or the bound is below
+        MIN_HEURISTIC_SHARE of the median edge's weight per km. Delay does
+        not grow with distance and falls under that threshold.
+        """
+        if self.lat is None:
+            return 0.0
+        if metric not in self._ratios:
+            if self._edge_km is None:
+                self._lat_rad = [radians(x) for x in self.lat]
+                self._lon_rad = [radians(x) for x in self.lon]
+                self._cos_lat = [cos(x) for x in self._lat_rad]
+                self._edge_km = [self._great_circle_km(u, self.targets[e])
+                                 for u in range(len(self.nodes))
+                                 for e in range(self.offsets[u], self.offsets[u + 1])]
+            per_km = sorted(weight / km for km, weight in zip(self._edge_km, self.weights[metric]) if km > 0)
+            ratio = per_km[0] if per_km else 0.0
+            if ratio <= 0 or ratio < MIN_HEURISTIC_SHARE * per_km[len(per_km) // 2]:
+                ratio = 0.0
+            self._ratios[metric] = ratio
+        return self._ratios[metric]
+
+    def astar(self, start, end, metric='distance', landmarks=None):
+        """
+        A* search goal-directed towards end.
+
+        The heuristic is heuristic_ratio(metric) * haversine(node, end), which
+        is admissible and consistent, so the first time end is settled its
+        value is optimal. With a LandmarkIndex (see landmarks.py) that covers
+        the metric, its ALT triangle-inequality bound is used instead: it is
+        consistent for any metric, usually tighter, and a table lookup per
+        node where the great-circle bound costs a haversine. With no usable
+        bound the search falls back to plain dijkstra().
+        last_settled reports the nodes expanded.
+
+        Returns:
+            A tuple (value, path), or (None, None) if end is unreachable.
+        """
+        start_id, end_id = self._check(start, end, metric)
+        if start_id is None or end_id is None:
+            return None, None
+
+        landmark_bound = landmarks.bound_function(metric, end_id) if landmarks is not None else None
+        ratio = self.heuristic_ratio(metric) if landmark_bound is None else 0.0
+        if landmark_bound is not None:
+            heuristic = landmark_bound
+        elif ratio > 0:
+            great_circle_km = self._great_circle_km
+            heuristic = lambda v: ratio * great_circle_km(v, end_id)
+        else:
+            return self.dijkstra(start, end, metric)
+
+        self._reset()
+        dist, pred, touched = self._dist, self._pred, self._touched
+        offsets, targets, column = self.offsets, self.targets, self.weights[metric]
+        h = {start_id: heuristic(start_id)}
+        dist[start_id] = 0
+        touched.append(start_id)
+        heap = [(h[start_id], start_id)]
+        settled = 0
+
+        while heap:
+            priority, u = heapq.heappop(heap)
+            curr_value = dist[u]
+            if priority > curr_value + h[u]:
+                continue
+            settled += 1
+            if u == end_id:
+                self.last_settled = settled
+                return curr_value, self._path(pred, start_id, end_id)
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                new_value = curr_value + column[e]
+                if new_value < dist[v]:
+                    if v not in h:
+                        h[v] = heuristic(v)
+                    if h[v] == INF:
+                        continue # The landmarks prove end is unreachable from v
+                    if dist[v] == INF:
+                        touched.append(v)
+                    dist[v] = new_value
+                    pred[v] = u
+                    heapq.heappush(heap, (new_value + h[v], v))
+
+        self.last_settled = settled
+        return None, None
+
+    def single_source(self, source, metric, reverse=False):
+        """
+        Runs a full Dijkstra from source (or, with reverse=True, towards it
+        over the reverse adjacency) without touching the query buffers.
+
+        Returns:
+            A tuple (dist, pred) of lists indexed by node id; pred holds the
+            previous node id (the next node id when reverse), or -1.
+        """
+        source_id = self.index[source]
+        num_nodes = len(self.nodes)
+        if reverse:
+            offsets, neighbors, edge_ids = self.reverse_adjacency()
+        else:
+            offsets, neighbors, edge_ids = self.offsets, self.targets, None
+        column = self.weights[metric]
+        dist = [INF] * num_nodes
+        pred = [-1] * num_nodes
+        dist[source_id] = 0
+        heap = [(0, source_id)]
+        while heap:
+            curr_value, u = heapq.heappop(heap)
+            if curr_value > dist[u]:
+                continue
+            for r in range(offsets[u], offsets[u + 1]):
+                v = neighbors[r]
+                new_value = curr_value + column[edge_ids[r] if reverse else r]
+                if new_value < dist[v]:
+                    dist[v] = new_value
+                    pred[v] = u
+                    heapq.heappush(heap, (new_value, v))
+        return dist, pred
+
+    def fingerprint(self):
+        """Hashes the bound network (nodes, edges and weights) to key caches built from it."""
+        digest = hashlib.sha256()
+        digest.update('\0'.join(self.nodes).encode('utf-8'))
+        digest.update(array('q', self.offsets).tobytes())
+        digest.update(array('q', self.targets).tobytes())
+        for metric in sorted(self.weights):
+            digest.update(metric.encode('utf-8'))
+            digest.update(array('d', self.weights[metric]).tobytes())
+        return digest.hexdigest()
+
+    def benchmark(self, metric, num_queries=1000, seed=0, method=None):
+        """
+        Times num_queries random origin/destination queries.
+
+        Returns:
+            A dict with queries_per_second and the average settled nodes.
+        """
+        method = method or self.dijkstra
+        rng = random.Random(seed)
+        pairs = [(rng.choice(self.nodes), rng.choice(self.nodes)) for _ in range(num_queries)]
+        settled = 0
+        start_time = time.perf_counter()
+        for start, end in pairs:
+            method(start, end, metric)
+            settled += self.last_settled
+        elapsed = time.perf_counter() - start_time
+        return {'queries_per_second': num_queries / elapsed, 'avg_settled': settled / num_queries}
+
+
+# --- Example Usage ---
+if __name__ == "__main__":
+    from Dijkstras import adj
+
+    engine = RoutingEngine(adj)
+    for metric in ('cost', 'time'):
+        value, path = engine.dijkstra('Chennai', 'San Francisco', metric)
+        print(f"Minimum {metric} from Chennai to San Francisco: {value} via {' -> '.join(path)}")
+
+    value, path = engine.bidirectional_dijkstra('Chennai', 'San Francisco', 'cost')
+    print(f"Bidirectional minimum cost: {value} via {' -> '.join(path)}")
+
+    stats = engine.benchmark('cost', num_queries=10000)
+    print(f"Benchmark: {stats['queries_per_second']:,.0f} queries/sec")
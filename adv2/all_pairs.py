@@ -0,0 +1,384 @@
+import hashlib
+import heapq
+import json
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Unreachable marker in the dense input matrices, as in floyd_marshall.py
+INF = sys.maxsize
+
+# Unreachable marker for int32 storage: small enough that adding two of them
+# cannot overflow, so min-plus updates need no per-cell INF checks.
+INT32_UNREACHABLE = np.int32(2**30 - 1)
+
+# File layout: MAGIC | header length (uint64) | JSON header | padding | edges | dist | next_hop.
+# Every matrix starts on an 8-byte boundary so it can be memory-mapped in place.
+MAGIC = b'GAAPSP01'
+_PREFIX = struct.Struct('<8sQ')
+_ALIGN = 8
+
+def _dense(matrix):
+    """Converts a list-of-lists matrix with INF padding into a compact int32 or float32 array."""
+    values = np.asarray(matrix, dtype=np.float64)
+    missing = values >= INF
+    finite = values[~missing]
+    if np.array_equal(finite, np.round(finite)) and (finite.size == 0 or finite.max() < INT32_UNREACHABLE):
+        return np.where(missing, INT32_UNREACHABLE, values).astype(np.int32)
+    return np.where(missing, np.inf, values).astype(np.float32)
+
+# TerminalGraph whose CSR arrays _dijkstra_sources reads. The pool
+# initializer sets it in each worker, and dijkstra() sets it directly when
+# it runs the batches in-process, so a batch task is just its source ids.
+_worker_graph = None
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+def _dijkstra_sources(sources):
+    """Worker: runs one heap Dijkstra per source and returns their (dist, next_hop) rows."""
+    graph = _worker_graph
+    # Plain lists index faster than array('i') in the inner loop.
+    dtype = np.int32 if graph.times.typecode == 'i' else np.float32
+    return _sparse_rows(graph.offsets.tolist(), graph.targets.tolist(), graph.times.tolist(), graph.num_nodes, sources, dtype)
+
+def _sparse_rows(offsets, targets, times, num_nodes, sources, dtype):
+    """One heap Dijkstra per source over CSR lists, returned as (dist, next_hop) rows of dtype."""
+    unreachable = _unreachable(dtype)
+    dist_rows = np.empty((len(sources), num_nodes), dtype=dtype)
+    hop_rows = np.empty((len(sources), num_nodes), dtype=np.int32)
+    for row, source in enumerate(sources):
+        dist = [INF] * num_nodes
+        first_hop = [-1] * num_nodes
+        dist[source] = 0
+        first_hop[source] = source
+        heap = [(0, source)]
+        while heap:
+            curr_value, u = heapq.heappop(heap)
+            if curr_value > dist[u]:
+                continue
+            hop = first_hop[u]
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                new_value = curr_value + times[e]
+                if new_value < dist[v]:
+                    dist[v] = new_value
+                    first_hop[v] = v if u == source else hop
+                    heapq.heappush(heap, (new_value, v))
+        values = np.array(dist, dtype=np.float64)
+        dist_rows[row] = np.where(values == INF, unreachable, values)
+        hop_rows[row] = first_hop
+    return dist_rows, hop_rows
+
+def _unreachable(dtype):
+    return INT32_UNREACHABLE if dtype == np.int32 else np.float32(np.inf)
+
+def graph_key(edges):
+    """Hashes a dense corridor matrix (as stored by AllPairs) to key its cached results."""
+    digest = hashlib.sha256()
+    digest.update(str(edges.dtype).encode('utf-8'))
+    digest.update(np.ascontiguousarray(edges).tobytes())
+    return digest.hexdigest()
+
+class AllPairs:
+    """
+    All-pairs shortest walking times for a terminal graph, with a next-hop
+    matrix for recovering the actual route.
+
+    dist[i, j] is the shortest time from i to j and next_hop[i, j] the node
+    to walk to first (-1 if j is unreachable). edges holds the direct
+    corridor times the result was computed from, so it can be repaired when
+    one of them changes. Integral times are stored as int32 (unreachable =
+    INT32_UNREACHABLE), others as float32 (unreachable = inf).
+
+    Space Complexity: O(n^2), 12 bytes per node pair.
+    """
+    def __init__(self, edges, dist, next_hop):
+        self.edges = edges
+        self.dist = dist
+        self.next_hop = next_hop
+
+    @property
+    def unreachable(self):
+        return _unreachable(self.dist.dtype)
+
+    @classmethod
+    def floyd_warshall(cls, matrix):
+        """
+        Runs Floyd-Warshall over a dense list-of-lists matrix (INF where
+        there is no corridor), as floyd_marshall.floyd_warshall does.
+
+        Each pivot k is one vectorized min-plus update of the whole matrix
+        from row k and column k, which pivot k itself never changes.
+
+        Time Complexity: O(n^3), in n NumPy passes.
+        """
+        return cls._from_edges(_dense(matrix))
+
+    @classmethod
+    def _from_edges(cls, edges):
+        num_nodes = len(edges)
+        dist = edges.copy()
+        next_hop = np.where(edges == _unreachable(edges.dtype), -1, np.arange(num_nodes)[None, :]).astype(np.int32)
+        np.fill_diagonal(next_hop, np.arange(num_nodes, dtype=np.int32))
+        cls._relax_all(dist, next_hop, range(num_nodes))
+        return cls(edges, dist, next_hop)
+
+    @classmethod
+    def dijkstra(cls, graph, workers=None, batch_size=64):
+        """
+        Computes the same result as floyd_warshall() from a sparse
+        TerminalGraph (see terminal_graph.py), with one heap Dijkstra per
+        source fanned out across a process pool in batches of batch_size.
+        Each worker receives the graph once. With workers=1 everything runs
+        in this process.
+
+        Time Complexity: O(n * (E + n log n)), which beats O(n^3) on sparse maps.
+        """
+        num_nodes = graph.num_nodes
+        dtype = np.int32 if graph.times.typecode == 'i' else np.float32
+        edges = np.full((num_nodes, num_nodes), _unreachable(dtype), dtype=dtype)
+        np.fill_diagonal(edges, 0)
+        sources = np.repeat(np.arange(num_nodes), np.diff(np.asarray(graph.offsets)))
+        targets = np.asarray(graph.targets)
+        # Keep the fastest of any parallel corridors, as Dijkstra does.
+        np.minimum.at(edges, (sources, targets), np.asarray(graph.times).astype(dtype))
+
+        dist = np.empty((num_nodes, num_nodes), dtype=dtype)
+        next_hop = np.empty((num_nodes, num_nodes), dtype=np.int32)
+        batches = [list(range(i, min(i + batch_size, num_nodes))) for i in range(0, num_nodes, batch_size)]
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            _init_worker(graph)
+            results = map(_dijkstra_sources, batches)
+            for batch, (dist_rows, hop_rows) in zip(batches, results):
+                dist[batch], next_hop[batch] = dist_rows, hop_rows
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(graph,)) as pool:
+                for batch, (dist_rows, hop_rows) in zip(batches, pool.map(_dijkstra_sources, batches)):
+                    dist[batch], next_hop[batch] = dist_rows, hop_rows
+        return cls(edges, dist, next_hop)
+
+    @staticmethod
+    def _relax_all(dist, next_hop, pivots):
+        # A sum involving an unreachable entry is never below the unreachable
+        # marker, so it can never win and needs no special casing.
+        for k in pivots:
+            through_k = dist[:, k, None] + dist[None, k, :]
+            improved = through_k < dist
+            np.copyto(dist, through_k, where=improved)
+            np.copyto(next_hop, np.broadcast_to(next_hop[:, k, None], next_hop.shape), where=improved)
+
+    def path(self, start, end):
+        """Returns the node ids walked from start to end, or None if end is unreachable."""
+        if self.next_hop[start, end] == -1:
+            return None
+        path = [start]
+        while start != end:
+            start = int(self.next_hop[start, end])
+            path.append(start)
+        return path
+
+    def to_matrix(self):
+        """Returns dist as a list-of-lists matrix with INF for unreachable pairs, like floyd_warshall()."""
+        return [[INF if value == self.unreachable else value.item() for value in row] for row in self.dist]
+
+    def _promote(self):
+        """Switches int32 storage to float32 so a fractional time can be stored."""
+        unreachable = self.unreachable
+        for name in ('edges', 'dist'):
+            values = getattr(self, name)
+            setattr(self, name, np.where(values == unreachable, np.inf, values).astype(np.float32))
+
+    def update_edge(self, u, v, time):
+        """
+        Changes the direct walking time of corridor u -> v (INF closes it)
+        and repairs dist and next_hop in place. Corridors are one-way here;
+        update both directions for a two-way corridor.
+
+        A decrease can only help paths that now use u -> v, so it is one
+        O(n^2) min-plus pass through that edge. An increase can only hurt
+        the sources with a shortest path over u -> v, and in each of those
+        rows only the targets reached over it, so only those are repaired
+        (see _repair_rows).
+
+        Returns:
+            The number of rows recomputed (0 for a decrease).
+        """
+        if time >= INF:
+            time = self.unreachable
+        elif self.dist.dtype == np.int32 and time != int(time):
+            self._promote()
+        old = self.edges[u, v]
+        self.edges[u, v] = time
+        if u == v or time == old:
+            return 0
+
+        dist, next_hop = self.dist, self.next_hop
+        if time < old:
+            # Widen int32 so unreachable + time + unreachable cannot overflow.
+            through = dist[:, u, None].astype(np.float64) + time + dist[None, v, :]
+            improved = through < dist
+            first_hop = next_hop[:, u].copy()
+            first_hop[u] = v
+            np.copyto(dist, np.minimum(through, self.unreachable).astype(dist.dtype), where=improved)
+            np.copyto(next_hop, np.broadcast_to(first_hop[:, None], next_hop.shape), where=improved)
+            return 0
+
+        if old == self.unreachable:
+            return 0
+        reaches_u = dist[:, u] != self.unreachable
+        via_edge = dist[:, u, None].astype(np.float64) + old + dist[None, v, :]
+        if dist.dtype == np.int32:
+            via_edge = via_edge == dist
+        else:
+            # float32 sums can round differently depending on their order;
+            # repairing an extra target is harmless, missing one is not.
+            via_edge = via_edge <= dist * (1 + 1e-6) + 1e-6
+        via_edge &= reaches_u[:, None]
+        rows = np.flatnonzero(via_edge.any(axis=1))
+        if len(rows):
+            self._repair_rows(rows, via_edge[rows])
+        return len(rows)
+
+    def _repair_rows(self, sources, affected):
+        """
+        Repairs dist and next_hop after a corridor got slower. For each
+        source, only the targets marked in its row of affected (those whose
+        shortest path used the corridor) can change; every other target
+        keeps a valid path. Affected targets are seeded from their
+        unaffected in-neighbours, then settled by a heap Dijkstra that stays
+        inside the affected set, over CSR lists of the corridors.
+
+        Time Complexity: O(A log A + corridors into A) per source, for A
+        affected targets, instead of a full O(n^2) dense pass.
+        """
+        edges, dist, next_hop = self.edges, self.dist, self.next_hop
+        num_nodes = len(edges)
+        unreachable = self.unreachable
+        corridors = edges != unreachable
+        np.fill_diagonal(corridors, False)
+        # Row-major nonzero is grouped by its first index: tails for out-lists, heads (via .T) for in-lists.
+        tails, heads = np.nonzero(corridors)
+        out_offsets = np.searchsorted(tails, np.arange(num_nodes + 1)).tolist()
+        out_heads, out_times = heads.tolist(), edges[tails, heads].tolist()
+        in_heads, in_tails = np.nonzero(corridors.T)
+        in_offsets = np.searchsorted(in_heads, np.arange(num_nodes + 1)).tolist()
+        in_tails, in_times = in_tails.tolist(), edges[in_tails, in_heads].tolist()
+
+        for source, mask in zip(sources.tolist(), affected):
+            mask[source] = False
+            targets = np.flatnonzero(mask)
+            inside = set(targets.tolist())
+            row, hops = dist[source].tolist(), next_hop[source].tolist()
+            value, first_hop = {}, {}
+            heap = []
+            for t in inside:
+                best, best_hop = INF, -1
+                for e in range(in_offsets[t], in_offsets[t + 1]):
+                    x = in_tails[e]
+                    if x not in inside and row[x] != unreachable and row[x] + in_times[e] < best:
+                        best, best_hop = row[x] + in_times[e], t if x == source else hops[x]
+                value[t], first_hop[t] = best, best_hop
+                if best < INF:
+                    heap.append((best, t))
+            heapq.heapify(heap)
+            while heap:
+                curr_value, u = heapq.heappop(heap)
+                if curr_value > value[u]:
+                    continue
+                for e in range(out_offsets[u], out_offsets[u + 1]):
+                    v = out_heads[e]
+                    if v in inside and curr_value + out_times[e] < value[v]:
+                        value[v], first_hop[v] = curr_value + out_times[e], first_hop[u]
+                        heapq.heappush(heap, (value[v], v))
+
+            values = np.array([value[t] for t in targets.tolist()], dtype=np.float64)
+            dist[source, targets] = np.where(values == INF, unreachable, values)
+            next_hop[source, targets] = [first_hop[t] for t in targets.tolist()]
+
+    def save(self, path, key=None):
+        """Writes the three matrices to a binary file that load() can memory-map."""
+        key = key or graph_key(self.edges)
+        header_bytes = json.dumps({'key': key, 'dtype': str(self.dist.dtype), 'num_nodes': len(self.dist)}).encode('utf-8')
+        padding = -(_PREFIX.size + len(header_bytes)) % _ALIGN
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_PREFIX.pack(MAGIC, len(header_bytes)))
+            f.write(header_bytes)
+            f.write(b'\0' * padding)
+            for matrix in (self.edges, self.dist, self.next_hop):
+                f.write(np.ascontiguousarray(matrix).tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, key=None):
+        """
+        Memory-maps a saved result copy-on-write, so updates never touch
+        the file. Returns None if the file is missing, truncated or
+        corrupt, or if key is given and does not match the saved graph.
+        """
+        try:
+            with open(path, 'rb') as f:
+                magic, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+                if magic != MAGIC or header_len > os.path.getsize(path):
+                    return None
+                header = json.loads(f.read(header_len))
+            if key is not None and header['key'] != key:
+                return None
+            num_nodes, dtype = int(header['num_nodes']), np.dtype(header['dtype'])
+            if dtype not in (np.int32, np.float32) or num_nodes < 0:
+                return None
+        except (FileNotFoundError, struct.error, ValueError, KeyError, TypeError):
+            return None
+
+        offset = _PREFIX.size + header_len
+        offset += -offset % _ALIGN
+        # edges and dist in dtype, next_hop in int32: all three are 4 bytes per cell.
+        if os.path.getsize(path) < offset + 3 * 4 * num_nodes * num_nodes:
+            return None
+        matrices = []
+        for matrix_dtype in (dtype, dtype, np.dtype(np.int32)):
+            matrices.append(np.memmap(path, dtype=matrix_dtype, mode='c', offset=offset, shape=(num_nodes, num_nodes)))
+            offset += matrix_dtype.itemsize * num_nodes * num_nodes
+        return cls(*matrices)
+
+    @classmethod
+    def load_or_build(cls, matrix, path):
+        """Loads the saved result for this exact matrix, running Floyd-Warshall and saving it if stale."""
+        edges = _dense(matrix)
+        key = graph_key(edges)
+        all_pairs = cls.load(path, key)
+        if all_pairs is not None and not all(m.shape == edges.shape for m in (all_pairs.edges, all_pairs.dist, all_pairs.next_hop)):
+            all_pairs = None
+        if all_pairs is None:
+            print(f"... Computing all-pairs paths for {len(edges):,} nodes ...")
+            all_pairs = cls._from_edges(edges)
+            all_pairs.save(path, key)
+            print("✅ All-pairs paths saved.")
+        return all_pairs
+
+
+# --- Example Usage ---
+if __name__ == "__main__":
+    from floyd_marshall import dist_matrix, floyd_warshall, nodes
+
+    all_pairs = AllPairs.floyd_warshall(dist_matrix)
+    print(f"Matches floyd_warshall(): {all_pairs.to_matrix() == floyd_warshall(dist_matrix)}")
+    route = all_pairs.path(0, 1)
+    print(f"Walk {nodes[0]['name']} -> {nodes[1]['name']} ({all_pairs.dist[0, 1]} mins): "
+          f"{' -> '.join(nodes[i]['name'] for i in route)}")
+
+    from terminal_graph import TerminalGraph
+    sparse = AllPairs.dijkstra(TerminalGraph.from_matrix(dist_matrix, INF), workers=1)
+    print(f"Sparse Dijkstra matches: {sparse.to_matrix() == all_pairs.to_matrix()}")
+
+    # Close the Skytrain link to D12 in both directions and walk around it.
+    for u, v in ((5, 1), (1, 5)):
+        all_pairs.update_edge(u, v, INF)
+    route = all_pairs.path(0, 1)
+    print(f"With the Skytrain link closed ({all_pairs.dist[0, 1]} mins): "
+          f"{' -> '.join(nodes[i]['name'] for i in route)}")
@@ -1,4 +1,6 @@
+import functools
 import sys
+import numpy as np
 
 
 # Each node represents a location in the airport terminal.
@@ -142,6 +144,148 @@ def build_greedy_itinerary(
     
     return itinerary
 
+# --------------------------------------------------------------------------
+# Step 4b: Exact Itinerary Optimizer
+# --------------------------------------------------------------------------
+
+# Most candidate POIs build_optimal_itinerary plans exactly. Its Held-Karp
+# pass covers all 2^n subsets, which takes about 25 ms at 14 POIs and
+# doubles with every POI after that, so this keeps a request under 50 ms.
+MAX_EXACT_POIS = 14
+
+@functools.lru_cache(maxsize=None)
+def _subset_layers(num_pois):
+    """
+    Index arrays for _held_karp, which depend only on the POI count:
+    sizes[mask] is the number of POIs in mask, and layers[size - 2] lists,
+    for each last POI, the masks of that size containing it and the same
+    masks without it.
+    """
+    masks = np.arange(1 << num_pois)
+    sizes = np.zeros(1 << num_pois, dtype=np.int64)
+    for i in range(num_pois):
+        sizes += masks >> i & 1
+    layers = []
+    for size in range(2, num_pois + 1):
+        layer = masks[sizes == size]
+        ends = [layer[layer >> last & 1 == 1] for last in range(num_pois)]
+        layers.append([(last, e, e ^ 1 << last) for last, e in enumerate(ends)])
+    return sizes, layers
+
+def _held_karp(travel, from_arrival, max_stops):
+    """
+    Held-Karp bitmask DP over every subset of up to max_stops POIs.
+
+    Returns (walk, sizes): walk[last, mask] is the quickest walk from the
+    arrival gate through every POI in mask, ending at last (inf when last
+    is not in mask or mask is too large), and sizes[mask] is its POI count.
+    Each layer of equally sized subsets is filled with one vectorized min
+    per last POI.
+    """
+    num_pois = len(from_arrival)
+    sizes, layers = _subset_layers(num_pois)
+    walk = np.full((num_pois, 1 << num_pois), np.inf)
+    walk[np.arange(num_pois), 1 << np.arange(num_pois)] = from_arrival
+    for layer in layers[:max_stops - 1]:
+        for last, ends, rests in layer:
+            walk[last, ends] = (walk[:, rests] + travel[:, last, None]).min(axis=0)
+    return walk, sizes
+
+def _best_plan(arrival_gate_id, departure_gate_id, budget, pois, values, shortest_paths_matrix, visit_duration):
+    """
+    Returns (value, minutes, order) of the most valuable POI set that fits
+    in budget minutes, visited in its quickest order; among sets of equal
+    value the quickest wins. order lists positions in pois.
+    """
+    def minutes(a, b):
+        return np.inf if shortest_paths_matrix[a][b] >= INF else shortest_paths_matrix[a][b]
+    travel = np.array([[minutes(a, b) for b in pois] for a in pois], dtype=np.float64).reshape(len(pois), len(pois))
+    from_arrival = np.array([minutes(arrival_gate_id, p) for p in pois], dtype=np.float64)
+    to_departure = np.array([minutes(p, departure_gate_id) for p in pois], dtype=np.float64)
+
+    # No plan has more stops than the cheapest stops (visit plus quickest walk in) allow.
+    stop_costs = np.sort(visit_duration + np.fmin(from_arrival, np.where(np.eye(len(pois), dtype=bool), np.inf, travel).min(axis=0, initial=np.inf)))
+    max_stops = int(np.searchsorted(np.cumsum(stop_costs) + (to_departure.min() if len(pois) else 0), budget, side='right'))
+
+    walk, sizes = _held_karp(travel, from_arrival, max_stops)
+    plan_times = (walk + to_departure[:, None]).min(axis=0, initial=np.inf) + visit_duration * sizes
+    plan_times[0] = minutes(arrival_gate_id, departure_gate_id)
+    plan_values = np.zeros(len(sizes))
+    for i, value in enumerate(values):
+        plan_values += (np.arange(len(sizes)) >> i & 1) * value
+
+    fits = np.flatnonzero(plan_times <= budget)
+    if not len(fits):
+        return 0, plan_times[0], []
+    most = fits[plan_values[fits] == plan_values[fits].max()]
+    best = mask = int(most[np.argmin(plan_times[most])])
+
+    # Walk the DP back from the departure gate to recover the visiting order.
+    order = []
+    if mask:
+        order.append(int(np.argmin(walk[:, mask] + to_departure)))
+        while mask != 1 << order[-1]:
+            mask ^= 1 << order[-1]
+            order.append(int(np.argmin(walk[:, mask] + travel[:, order[-1]])))
+    order.reverse()
+    return plan_values[best], plan_times[best], order
+
+def build_optimal_itinerary(
+    arrival_gate_id,
+    departure_gate_id,
+    layover_time_mins,
+    interesting_node_ids,
+    shortest_paths_matrix,
+    nodes_data,
+    visit_duration=45,
+    safety_buffer=40,
+    poi_values=None,  # Optional {node_id: value}; by default every POI is worth 1
+    max_exact_pois=MAX_EXACT_POIS
+):
+    """
+    Finds the set of POIs with the highest total value (the most stops by
+    default) that can still be visited before reaching the departure gate
+    within layover_time_mins - safety_buffer, and among those the plan
+    with the quickest visiting order.
+
+    The plan is exact when at most max_exact_pois POIs could fit: a
+    Held-Karp pass gives the quickest visiting time of every subset at
+    once, and the best subset that fits wins. With more candidates, the
+    exact plan over the max_exact_pois most valuable (then closest) POIs
+    is compared with the greedy itinerary, the better one is returned, and
+    its first step is marked 'heuristic': True.
+
+    Returns the same itinerary format as build_greedy_itinerary.
+    """
+    greedy = build_greedy_itinerary(arrival_gate_id, departure_gate_id, layover_time_mins, interesting_node_ids,
+                                    shortest_paths_matrix, nodes_data, visit_duration, safety_buffer)
+    value_of = (lambda p: 1) if poi_values is None else (lambda p: poi_values.get(p, 0))
+    budget = layover_time_mins - safety_buffer
+    # Worthless POIs can only cost time, and a POI that does not fit on its own never fits.
+    pois = [p for p in dict.fromkeys(interesting_node_ids) if value_of(p) > 0 and shortest_paths_matrix[arrival_gate_id][p]
+            + visit_duration + shortest_paths_matrix[p][departure_gate_id] <= budget]
+    heuristic = len(pois) > max_exact_pois
+    if heuristic:
+        pois = sorted(pois, key=lambda p: (-value_of(p), shortest_paths_matrix[arrival_gate_id][p]))[:max_exact_pois]
+
+    value, time, order = _best_plan(arrival_gate_id, departure_gate_id, budget, pois, [value_of(p) for p in pois],
+                                    shortest_paths_matrix, visit_duration)
+    greedy_stops = [step['id'] for step in greedy[1:-1]]
+    greedy_value = sum(value_of(p) for p in greedy_stops)
+    greedy_time = sum(step['travel_time'] for step in greedy) + visit_duration * len(greedy_stops)
+    if greedy_value > value or (greedy_value == value and greedy_time < time):
+        itinerary = greedy
+    else:
+        itinerary = [{'id': arrival_gate_id, 'travel_time': 0}]
+        current_location_id = arrival_gate_id
+        for i in order:
+            itinerary.append({'id': pois[i], 'travel_time': shortest_paths_matrix[current_location_id][pois[i]]})
+            current_location_id = pois[i]
+        itinerary.append({'id': departure_gate_id, 'travel_time': shortest_paths_matrix[current_location_id][departure_gate_id]})
+    if heuristic:
+        itinerary[0]['heuristic'] = True
+    return itinerary
+
 # --------------------------------------------------------------------------
 # Step 5: Formatting and Main Execution
 # --------------------------------------------------------------------------
@@ -149,6 +293,8 @@ def build_greedy_itinerary(
 def format_itinerary(itinerary, nodes_data, visit_duration, safety_buffer):
     """Prints the generated itinerary in a user-friendly format."""
     print("Personalized Layover Plan ")
+    if itinerary[0].get('heuristic'):
+        print("(Heuristic: too many places to compare every plan.)")
     print("-" * 38)
     
     total_time_spent = 0
@@ -193,19 +339,23 @@ if __name__ == "__main__":
     layover_minutes = layover_hours * 60
 
     # 2. Pre-compute all-pairs shortest paths using Floyd-Warshall.
-    #    In a real application, this would be done once and cached.
-    all_pairs_shortest_paths = floyd_warshall(dist_matrix)
+    #    The result is cached on disk and reused until the terminal map changes.
+    from all_pairs import AllPairs
+    all_pairs = AllPairs.load_or_build(dist_matrix, 'terminal_paths.apsp')
+    all_pairs_shortest_paths = all_pairs.to_matrix()
 
     # 3. Find all locations that match the passenger's interests.
-    interesting_places_ids = find_interesting_locations(nodes, passenger_interests)
+    #    The tag index is built once and reused for every passenger.
+    from tag_index import TagIndex
+    interesting_places_ids = TagIndex(nodes).find(passenger_interests)
     print(f"System: Found potential locations based on interests: {interesting_places_ids}\n")
 
-    # 4. Build the greedy itinerary with the specified parameters.
+    # 4. Build the best itinerary with the specified parameters.
     #    These parameters could be adjusted based on user input.
     visit_duration_per_stop = 45
     boarding_safety_buffer = 40
     
-    final_itinerary = build_greedy_itinerary(
+    final_itinerary = build_optimal_itinerary(
         arrival_gate_id=arrival_gate_id,
         departure_gate_id=departure_gate_id,
         layover_time_mins=layover_minutes,
@@ -0,0 +1,89 @@
+import numpy as np
+
+# Passengers matched per vectorized step in TagIndex.find_many.
+BATCH_CHUNK = 256
+
+class TagIndex:
+    """
+    Prebuilt tag lookup over a terminal's nodes, answering the same question
+    as floyd_marshall.find_interesting_locations without scanning every node.
+
+    Every node gets a position in nodes_data order. Each tag keeps a posting
+    bitset (a Python int with bit p set for the node at position p), so one
+    passenger's matches are the OR of a few postings. Each node also keeps
+    its tags as a bitmask (bit t for tag number t), so many passengers can be
+    matched at once with one vectorized AND.
+    """
+    def __init__(self, nodes_data):
+        self.node_ids = list(nodes_data)
+        self.tag_bits = {} # tag -> bit number
+        self.postings = {} # tag -> bitset of node positions, gates excluded
+        node_masks = []
+        for position, (node_id, data) in enumerate(nodes_data.items()):
+            mask = 0
+            for tag in data['tags']:
+                bit = self.tag_bits.setdefault(tag, len(self.tag_bits))
+                mask |= 1 << bit
+                # Gates are never points of interest to visit.
+                if data['type'] != 'gate':
+                    self.postings[tag] = self.postings.get(tag, 0) | 1 << position
+            node_masks.append(0 if data['type'] == 'gate' else mask)
+        self.node_masks = node_masks
+        # The vectorized batch path needs every tag mask to fit one uint64.
+        self._mask_array = np.array(node_masks, dtype=np.uint64) if len(self.tag_bits) <= 64 else None
+
+    def interest_mask(self, user_interests):
+        """Returns the bitmask of the given tags; unknown tags match nothing."""
+        mask = 0
+        for tag in user_interests:
+            bit = self.tag_bits.get(tag)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def _ids(self, positions):
+        """Node ids for the set bits of a position bitset, unpacked in one NumPy call."""
+        packed = np.frombuffer(positions.to_bytes((len(self.node_ids) + 7) // 8, 'little'), dtype=np.uint8)
+        return [self.node_ids[p] for p in np.flatnonzero(np.unpackbits(packed, bitorder='little'))]
+
+    def find(self, user_interests):
+        """Returns the non-gate node ids sharing a tag with user_interests, in nodes_data order."""
+        positions = 0
+        for tag in set(user_interests):
+            positions |= self.postings.get(tag, 0)
+        return self._ids(positions)
+
+    def find_many(self, interests_per_passenger):
+        """
+        Resolves many passengers' interests in one call.
+
+        Returns:
+            A list with find(interests) for each passenger, in input order.
+        """
+        queries = [self.interest_mask(interests) for interests in interests_per_passenger]
+        if self._mask_array is None:
+            return [self._ids(self._positions(mask)) for mask in queries]
+        results = []
+        # Chunked so the (passengers x nodes) hit matrix stays small.
+        for start in range(0, len(queries), BATCH_CHUNK):
+            chunk = np.array(queries[start:start + BATCH_CHUNK], dtype=np.uint64)
+            hits = (self._mask_array[None, :] & chunk[:, None]) != 0
+            results.extend([self.node_ids[p] for p in np.flatnonzero(row)] for row in hits)
+        return results
+
+    def _positions(self, mask):
+        positions = 0
+        for tag, bit in self.tag_bits.items():
+            if mask >> bit & 1:
+                positions |= self.postings.get(tag, 0)
+        return positions
+
+
+# --- Example Usage ---
+if __name__ == "__main__":
+    from floyd_marshall import nodes, find_interesting_locations
+
+    index = TagIndex(nodes)
+    passengers = [['lounge', 'food', 'quick'], ['coffee'], ['luxury', 'transport'], ['spa']]
+    for interests, matches in zip(passengers, index.find_many(passengers)):
+        print(f"{interests}: {matches} (scan: {find_interesting_locations(nodes, interests)})")
@@ -0,0 +1,97 @@
+import csv
+import os
+from array import array
+
+_LOCATIONS_COMMENT = '# locations: '
+
+class TerminalGraph:
+    """
+    Sparse terminal map: walkable locations 0..num_nodes-1 and the timed
+    corridors between them, in CSR form.
+
+    The corridors leaving node u are targets[offsets[u]:offsets[u + 1]],
+    with walking times in the same slots of times. Real concourses have a
+    handful of corridors per node, so this is O(n + corridors) instead of
+    the O(n^2) of a dense dist_matrix.
+    """
+    def __init__(self, num_nodes, offsets, targets, times):
+        self.num_nodes = num_nodes
+        self.offsets = offsets
+        self.targets = targets
+        self.times = times
+
+    @classmethod
+    def from_edges(cls, num_nodes, edges, two_way=True):
+        """
+        Builds the CSR arrays from (u, v, minutes) corridors. With
+        two_way=True every corridor is also walkable from v to u.
+        """
+        if two_way:
+            edges = [e for u, v, t in edges for e in ((u, v, t), (v, u, t))]
+        counts = [0] * num_nodes
+        for u, _, _ in edges:
+            counts[u] += 1
+        offsets = array('q', [0])
+        for count in counts:
+            offsets.append(offsets[-1] + count)
+        cursor = list(offsets[:-1])
+        targets = array('i', [0] * len(edges))
+        integral = all(float(t).is_integer() for _, _, t in edges)
+        times = array('i' if integral else 'd', [0] * len(edges))
+        for u, v, t in edges:
+            targets[cursor[u]] = v
+            times[cursor[u]] = int(t) if integral else t
+            cursor[u] += 1
+        return cls(num_nodes, offsets, targets, times)
+
+    @classmethod
+    def from_matrix(cls, matrix, inf):
+        """Converts a dense dist_matrix (inf where there is no corridor) into a TerminalGraph."""
+        edges = [(u, v, t) for u, row in enumerate(matrix) for v, t in enumerate(row) if u != v and t != inf]
+        return cls.from_edges(len(matrix), edges, two_way=False)
+
+    @classmethod
+    def load(cls, path, two_way=True):
+        """
+        Reads an edge-list file with one `from,to,minutes` corridor per
+        line; blank lines and lines starting with '#' are skipped. The node
+        count is one past the largest id, or the `# locations: N` line
+        save() writes, whichever is larger.
+        Returns None if the file is missing.
+        """
+        edges = []
+        num_nodes = 0
+        try:
+            with open(path, newline='') as f:
+                for row in csv.reader(f):
+                    if not row:
+                        continue
+                    if row[0].lstrip().startswith('#'):
+                        # save() records the location count so trailing isolated nodes survive.
+                        if row[0].startswith(_LOCATIONS_COMMENT):
+                            num_nodes = max(num_nodes, int(row[0][len(_LOCATIONS_COMMENT):]))
+                        continue
+                    u, v, minutes = int(row[0]), int(row[1]), float(row[2])
+                    edges.append((u, v, minutes))
+                    num_nodes = max(num_nodes, u + 1, v + 1)
+        except FileNotFoundError:
+            print(f"Error: {path} not found."); return None
+        return cls.from_edges(num_nodes, edges, two_way)
+
+    def save(self, path):
+        """Writes every corridor as one directed `from,to,minutes` line; load with two_way=False."""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', newline='') as f:
+            f.write(f"{_LOCATIONS_COMMENT}{self.num_nodes}\n")
+            writer = csv.writer(f)
+            for u in range(self.num_nodes):
+                for e in range(self.offsets[u], self.offsets[u + 1]):
+                    writer.writerow((u, self.targets[e], self.times[e]))
+        os.replace(tmp_path, path)
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def __str__(self):
+        return f"TerminalGraph with {self.num_nodes} locations and {self.num_edges} corridors."
@@ -0,0 +1,88 @@
+import itertools
+import random
+import time
+
+from floyd_marshall import INF, MAX_EXACT_POIS, build_greedy_itinerary, build_optimal_itinerary, dist_matrix, floyd_warshall, nodes
+
+VISIT, BUFFER = 45, 40
+
+
+def plan_cost(itinerary, visit_duration, value_of):
+    """(total value, gate-to-gate minutes with visits) of an itinerary."""
+    stops = [step['id'] for step in itinerary[1:-1]]
+    return sum(value_of(p) for p in stops), sum(step['travel_time'] for step in itinerary) + visit_duration * len(stops)
+
+
+def brute_force(arrival, departure, budget, pois, paths, visit_duration, value_of):
+    """Best (value, minutes) over every order of every subset of pois that fits in budget."""
+    best = (0, paths[arrival][departure])
+    for size in range(1, len(pois) + 1):
+        for order in itertools.permutations(pois, size):
+            time, current = visit_duration * size, arrival
+            for p in order:
+                time, current = time + paths[current][p], p
+            time += paths[current][departure]
+            value = sum(value_of(p) for p in order)
+            if time <= budget and (value > best[0] or (value == best[0] and time < best[1])):
+                best = (value, time)
+    return best
+
+
+def random_terminal(rng, num_nodes):
+    """Shortest paths of a random connected terminal with two-way corridors."""
+    matrix = [[0 if u == v else INF for v in range(num_nodes)] for u in range(num_nodes)]
+    corridors = [(v, rng.randrange(v)) for v in range(1, num_nodes)]
+    corridors += [tuple(rng.sample(range(num_nodes), 2)) for _ in range(num_nodes)]
+    for u, v in corridors:
+        matrix[u][v] = matrix[v][u] = min(matrix[u][v], rng.randint(1, 25))
+    return floyd_warshall(matrix)
+
+
+def test_demo_terminal_beats_greedy_order():
+    paths = floyd_warshall(dist_matrix)
+    pois = [2, 3, 6]
+    greedy = build_greedy_itinerary(0, 1, 360, pois, paths, nodes, VISIT, BUFFER)
+    optimal = build_optimal_itinerary(0, 1, 360, pois, paths, nodes, VISIT, BUFFER)
+    assert [step['id'] for step in optimal[1:-1]] == [2, 6, 3]
+    assert plan_cost(optimal, VISIT, lambda p: 1) == (3, 154) < plan_cost(greedy, VISIT, lambda p: 1)
+
+
+def test_matches_brute_force_on_random_terminals():
+    rng = random.Random(7)
+    for _ in range(60):
+        paths = random_terminal(rng, 10)
+        pois = rng.sample(range(2, 10), rng.randint(3, 7))
+        layover = rng.randint(2, 6) * 60
+        visit = rng.choice([15, 30, 45])
+        weights = rng.choice([None, {p: rng.randint(1, 4) for p in pois}])
+        value_of = (lambda p: 1) if weights is None else weights.get
+
+        itinerary = build_optimal_itinerary(0, 1, layover, pois, paths, None, visit, BUFFER, poi_values=weights)
+        expected = brute_force(0, 1, layover - BUFFER, pois, paths, visit, value_of)
+        assert plan_cost(itinerary, visit, value_of) == expected
+
+
+def test_heuristic_above_exact_limit():
+    rng = random.Random(3)
+    paths = random_terminal(rng, 26)
+    pois = list(range(2, 22))
+    itinerary = build_optimal_itinerary(0, 1, 9 * 60, pois, paths, None, 20, BUFFER)
+    greedy = build_greedy_itinerary(0, 1, 9 * 60, pois, paths, None, 20, BUFFER)
+    assert itinerary[0].get('heuristic') is True
+    assert plan_cost(itinerary, 20, lambda p: 1)[0] >= plan_cost(greedy, 20, lambda p: 1)[0]
+
+    exact = build_optimal_itinerary(0, 1, 9 * 60, pois[:MAX_EXACT_POIS], paths, None, 20, BUFFER)
+    assert 'heuristic' not in exact[0]
+
+
+def test_twenty_pois_within_50_ms():
+    rng = random.Random(5)
+    paths = random_terminal(rng, 26)
+    for pois in (list(range(2, 22)), list(range(2, 2 + MAX_EXACT_POIS))):
+        for layover, visit in ((6 * 60, 45), (12 * 60, 15)):
+            timings = []
+            for _ in range(5):
+                start = time.perf_counter()
+                build_optimal_itinerary(0, 1, layover, pois, paths, None, visit, BUFFER)
+                timings.append(time.perf_counter() - start)
+            assert min(timings) < 0.05